@@ -1,37 +1,214 @@
-from src.api.chromadb_api import add_document_to_chromadb
+import io
+import os
+import threading
+from collections import deque
+from src.agents.ocr import MIN_OCR_IMAGE_BYTES, OCRService, join_ocr_results
+from src.api.chromadb_api import add_document_to_chromadb, persist_directory, sync_document_chunks
+from src.api.manifest import ChunkIdAllocator, content_hash
 from PyPDF2 import PdfReader
 from youtube_transcript_api import YouTubeTranscriptApi
 from pptx import Presentation
+from pptx.shapes.picture import Picture
+from src.utils.chunking import chunk_text
+from src.utils.pipeline import run_stage
+
+
+def _file_hash(file):
+    """Hash the full contents of an uploaded file without moving its read position."""
+    if hasattr(file, "getvalue"):
+        return content_hash(file.getvalue())
+    position = file.tell()
+    data = file.read()
+    file.seek(position)
+    return content_hash(data)
+
+
+def _page_images(page):
+    """Return the encoded images embedded in a PDF page, skipping unreadable ones."""
+    try:
+        return [image.data for image in page.images if len(image.data) >= MIN_OCR_IMAGE_BYTES]
+    except Exception as e:
+        print(f"Error extracting page images: {e}")
+        return []
+
+
+def _iter_pdf_pages(reader, first=1, last=None):
+    """
+    Yield (page_num, text, images) triples from a PdfReader, optionally only
+    for pages `first` to `last` (1-based, inclusive).
+
+    `images` holds the page's embedded images when it has no extractable
+    text (a scanned page), and is empty otherwise.
+    """
+    last = len(reader.pages) if last is None else min(last, len(reader.pages))
+    for page_num in range(first, last + 1):
+        page = reader.pages[page_num - 1]
+        text = page.extract_text() or ""
+        yield page_num, text, [] if text.strip() else _page_images(page)
+
+
+def _iter_pptx_slides(presentation, first=1, last=None):
+    """
+    Yield (slide_num, text, images) triples, joining all text boxes of a
+    slide and collecting its pictures, which carry no extractable text.
+    Optionally only slides `first` to `last` (1-based, inclusive).
+    """
+    slides = presentation.slides
+    last = len(slides) if last is None else min(last, len(slides))
+    for slide_idx in range(first, last + 1):
+        slide = slides[slide_idx - 1]
+        shape_texts = [shape.text.strip() for shape in slide.shapes if shape.has_text_frame]
+        images = [
+            shape.image.blob for shape in slide.shapes
+            if isinstance(shape, Picture) and len(shape.image.blob) >= MIN_OCR_IMAGE_BYTES
+        ]
+        yield slide_idx, "\n\n".join(text for text in shape_texts if text), images
+
+
+def count_pdf_pages(path):
+    """Return the number of pages of a PDF file."""
+    return len(PdfReader(path).pages)
+
+
+def extract_pdf_range(path, first, last):
+    """
+    Return the (page_num, text, images) triples of pages `first` to `last`
+    of a PDF file.
+
+    Module-level and free of shared state so it can run in a worker process;
+    the worker reads the file itself, so only the requested pages cross the
+    process boundary.
+    """
+    return list(_iter_pdf_pages(PdfReader(path), first, last))
+
+
+def count_pptx_slides(path):
+    """Return the number of slides of a PowerPoint file."""
+    return len(Presentation(path).slides)
+
+
+def extract_pptx_range(path, first, last):
+    """
+    Return the (slide_num, text, images) triples of slides `first` to `last`
+    of a PowerPoint file. Runs in a worker process, like `extract_pdf_range`.
+    """
+    return list(_iter_pptx_slides(Presentation(path), first, last))
+
+
+def extract_image(data):
+    """Wrap raw image bytes as a single (page_num, text, images) triple to be OCRed."""
+    return [(1, "", [data])]
+
+
+# Pages or slides whose images may be queued for OCR at the same time; the
+# process pool holds each queued image's bytes until it is recognized
+OCR_MAX_PENDING_UNITS = int(os.getenv("OCR_MAX_PENDING_UNITS", "8"))
 
 
 class ContentIngestionAgent:
 
-    def process_pdf(self, file):
+    def __init__(self, ocr_service=None):
+        self._ocr_service = ocr_service
+        self._ocr_lock = threading.Lock()
+
+    def get_ocr_service(self):
+        # The OCR process pool is only started once a document needs it
+        if self._ocr_service is None:
+            with self._ocr_lock:
+                if self._ocr_service is None:
+                    self._ocr_service = OCRService(
+                        os.getenv("OCR_CACHE_DIR", os.path.join(persist_directory, "ocr_cache")),
+                        lang=os.getenv("OCR_LANG", "eng"),
+                        max_cache_bytes=int(os.getenv("OCR_CACHE_MAX_MB", "64")) * 1024 * 1024,
+                    )
+        return self._ocr_service
+
+    def apply_ocr(self, units):
         """
-        Process a PDF file, extract text, split into chunks, and store it in the vector database.
+        Turn (num, text, images) triples into (num, text) pairs, adding the
+        OCR text of the images.
+
+        Units without images are passed on immediately while their images'
+        OCR runs on the process pool; OCRed units follow, oldest first, as
+        soon as their text is recognized. At most `OCR_MAX_PENDING_UNITS`
+        units wait for OCR at a time, so memory stays flat on fully scanned
+        documents and reading further pages waits for OCR to catch up.
         """
-        try:
-            reader = PdfReader(file)
-            text_chunks = []
+        def finish(unit):
+            num, text, futures = unit
+            ocr_text = join_ocr_results(futures)
+            return num, "\n\n".join(part for part in (text.strip(), ocr_text) if part)
 
+        pending = deque()
+        for num, text, images in units:
+            if images:
+                ocr_service = self.get_ocr_service()
+                pending.append((num, text, [ocr_service.submit(image) for image in images]))
+            else:
+                yield num, text
+            while pending and (
+                len(pending) > OCR_MAX_PENDING_UNITS or all(future.done() for future in pending[0][2])
+            ):
+                yield finish(pending.popleft())
+        while pending:
+            yield finish(pending.popleft())
+
+    def ingest_pdf_pages(self, file_name, pages, total_pages, file_hash=None, progress_callback=None):
+        """
+        Chunk already extracted PDF pages and store them in the vector database.
+
+        `pages` can be a list or a generator of (page_num, text, images)
+        triples; images of scanned pages are OCRed.
+        `progress_callback(page_num, total_pages)` is called as pages are written.
+        Raises on failure; returns a summary of what changed.
+        """
+        def chunk_pages(pages):
+            chunk_id = ChunkIdAllocator(file_name)
             # Split text into chunks
-            for page_num, page in enumerate(reader.pages):
-                text = page.extract_text()
-                chunks = text.split("\n\n")  # Split by paragraph
-                for chunk in chunks:
+            for page_num, text in pages:
+                for chunk in chunk_text(text):
                     metadata = {
-                        "file_name": file.name,
+                        "file_name": file_name,
                         "type": "pdf",
-                        "page_num": page_num + 1,
-                        "unique_id": f"{file.name}_page_{page_num + 1}"
+                        "page_num": page_num,
+                        "unique_id": chunk_id(chunk, location=f"page_{page_num}")
                     }
-                    text_chunks.append({"content": chunk, "metadata": metadata})
+                    yield {"content": chunk, "metadata": metadata}
 
-            # Add pre-chunked content to ChromaDB
-            return add_document_to_chromadb(chunks=text_chunks)
+        pages_written = 0
+
+        def report_progress(batch):
+            nonlocal pages_written
+            pages_written = max(pages_written, max(chunk["metadata"]["page_num"] for chunk in batch))
+            if progress_callback:
+                progress_callback(pages_written, total_pages)
+
+        text_chunks = run_stage(chunk_pages(self.apply_ocr(pages)), maxsize=128, name="pdf-chunk")
+
+        # Add pre-chunked content to ChromaDB
+        result = sync_document_chunks(file_name, text_chunks, file_hash=file_hash, on_batch_written=report_progress)
+        if progress_callback:
+            progress_callback(total_pages, total_pages)
+        return result
+
+    def process_pdf(self, file, progress_callback=None):
+        """
+        Process a PDF file, extract text, split into chunks, and store it in the vector database.
+
+        Pages are streamed through extraction, chunking and embedding stages
+        connected by bounded queues, so memory use does not grow with the
+        document size. `progress_callback(page_num, total_pages)` is called
+        as pages are written.
+        """
+        try:
+            reader = PdfReader(file)
+            pages = run_stage(_iter_pdf_pages(reader), maxsize=4, name="pdf-extract")
+            return self.ingest_pdf_pages(
+                file.name, pages, len(reader.pages), file_hash=_file_hash(file), progress_callback=progress_callback
+            )
         except Exception as e:
             return f"Error processing PDF file '{file.name}': {e}"
-        
+
 
     def process_youtube_video(self, video_url):
         """
@@ -42,38 +219,92 @@ class ContentIngestionAgent:
             transcript = YouTubeTranscriptApi.get_transcript(video_id)
             content = " ".join([t['text'] for t in transcript])
 
-            metadata = {
-                "file_name": f"YouTube_{video_id}",
-                "type": "youtube",
-                "unique_id": video_id
-            }
+            text_chunks = []
+            chunk_id = ChunkIdAllocator(video_id)
+            for chunk_idx, chunk in enumerate(chunk_text(content), start=1):
+                metadata = {
+                    "file_name": f"YouTube_{video_id}",
+                    "type": "youtube",
+                    "chunk_num": chunk_idx,
+                    "unique_id": chunk_id(chunk)
+                }
+                text_chunks.append({"content": chunk, "metadata": metadata})
 
-            # Add content and metadata to ChromaDB
-            return add_document_to_chromadb(content=content, metadata=metadata)
+            # Add pre-chunked content to ChromaDB
+            return add_document_to_chromadb(
+                chunks=text_chunks,
+                file_name=f"YouTube_{video_id}",
+                file_hash=content_hash(content),
+            )
         except Exception as e:
             return f"Error processing YouTube video: {e}"
-      
+
+    def ingest_pptx_slides(self, file_name, slides, file_hash=None):
+        """
+        Chunk already extracted slide texts and store them in the vector database.
+
+        `slides` holds (slide_num, text, images) triples; pictures are OCRed.
+        Raises on failure; returns a summary of what changed.
+        """
+        text_chunks = []
+        chunk_id = ChunkIdAllocator(file_name)
+
+        for slide_idx, slide_text in self.apply_ocr(slides):
+            # Chunk the slide as a whole so small text boxes are merged
+            for chunk in chunk_text(slide_text):
+                metadata = {
+                    "file_name": file_name,
+                    "type": "pptx",
+                    "slide_num": slide_idx,
+                    "unique_id": chunk_id(chunk, location=f"slide_{slide_idx}")
+                }
+                text_chunks.append({"content": chunk, "metadata": metadata})
+
+        # Add pre-chunked content to ChromaDB
+        return sync_document_chunks(file_name, text_chunks, file_hash=file_hash)
+
     def process_pptx(self, file):
         """
         Extract text and images from a PowerPoint presentation and store it in the vector database.
         """
         try:
             presentation = Presentation(file)
-            text_chunks = []
+            return self.ingest_pptx_slides(file.name, _iter_pptx_slides(presentation), file_hash=_file_hash(file))
+        except Exception as e:
+            return f"Error processing PowerPoint file '{file.name}': {e}"
 
-            for slide_idx, slide in enumerate(presentation.slides, start=1):
-                for shape_idx, shape in enumerate(slide.shapes, start=1):
-                    if shape.has_text_frame:
-                        text = shape.text.strip()
-                        metadata = {
-                            "file_name": file.name,
-                            "type": "pptx",
-                            "slide_num": slide_idx,
-                            "unique_id": f"{file.name}_slide_{slide_idx}_shape_{shape_idx}"
-                        }
-                        text_chunks.append({"content": text, "metadata": metadata})
+    def ingest_image(self, file_name, units, file_hash=None):
+        """
+        OCR an image (e.g. a scanned page or photographed notes) and store its text in the vector database.
 
-            # Add pre-chunked content to ChromaDB
-            return add_document_to_chromadb(chunks=text_chunks)
+        `units` holds (page_num, text, images) triples, see `extract_image`.
+        Raises on failure; returns a summary of what changed.
+        """
+        text_chunks = []
+        chunk_id = ChunkIdAllocator(file_name)
+
+        for page_num, text in self.apply_ocr(units):
+            for chunk in chunk_text(text):
+                metadata = {
+                    "file_name": file_name,
+                    "type": "image",
+                    "page_num": page_num,
+                    "unique_id": chunk_id(chunk, location=f"page_{page_num}")
+                }
+                text_chunks.append({"content": chunk, "metadata": metadata})
+
+        if not text_chunks:
+            raise ValueError("no text recognized")
+
+        # Add pre-chunked content to ChromaDB
+        return sync_document_chunks(file_name, text_chunks, file_hash=file_hash)
+
+    def process_image(self, file):
+        """
+        Extract text from an image file with OCR and store it in the vector database.
+        """
+        try:
+            data = file.getvalue() if hasattr(file, "getvalue") else file.read()
+            return self.ingest_image(file.name, extract_image(data), file_hash=content_hash(data))
         except Exception as e:
-            return f"Error processing PowerPoint file '{file.name}': {e}"
\ No newline at end of file
+            return f"Error processing image file '{file.name}': {e}"
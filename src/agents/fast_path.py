@@ -0,0 +1,58 @@
+import re
+
+from src.api.llm_stream import stream_llm_run
+
+# Requests that need the summary agent to expand the context into a report
+_SUMMARY_PATTERNS = re.compile(
+    r"\b(summar(y|ies|ize|ise|izing|ising)|overview|outline|recap|tl;?dr|"
+    r"(write|create|make|generate|give me) (a |an )?(detailed |full )?report|"
+    r"key (points|takeaways|topics)|main (points|ideas|topics)|"
+    r"(whole|entire|full) (document|deck|file|pdf|presentation|lecture))\b",
+    re.IGNORECASE,
+)
+
+QA_SYSTEM_PROMPT = (
+    "You are a question answering specialist helping a student. Answer the user's question "
+    "using the provided context. Be concise yet comprehensive. When you use the context, cite "
+    "it as 'Document: [file name], page: [page number]', or by its link for web results. If "
+    "the context does not contain the answer, say so and answer from general knowledge, making "
+    "clear which parts are not from the documents."
+)
+
+QUIZ_SYSTEM_PROMPT = (
+    "You are a quiz creator. Create a multiple-choice quiz on the topic given by the user, "
+    "based on the provided context where possible. Each question has plausible options and "
+    "the correct answer marked, with references to the context ('Document: [file name], "
+    "page: [page number]', or the link for web results) wherever applicable."
+)
+
+
+def needs_summary(prompt):
+    """
+    Decide whether a request needs the multi-agent summarization crew.
+
+    Explicit requests for summaries, reports, overviews or whole-document
+    coverage escalate; focused questions take the single-call fast path.
+    """
+    return bool(_SUMMARY_PATTERNS.search(prompt))
+
+
+def build_fast_path_messages(prompt, context, agent_type):
+    """Build the chat messages for a single-call answer."""
+    system_prompt = QUIZ_SYSTEM_PROMPT if agent_type == "Quiz Creator" else QA_SYSTEM_PROMPT
+    context_text = context or "No documents matched this request."
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"Context:\n{context_text}\n\nRequest: {prompt}"},
+    ]
+
+
+def stream_fast_answer(llm, prompt, context, agent_type):
+    """
+    Answer directly from the packed context in one streaming LLM call.
+
+    Yields the same events as `stream_crew`: ("token", str) for each token
+    and finally ("result", str) with the full answer.
+    """
+    messages = build_fast_path_messages(prompt, context, agent_type)
+    yield from stream_llm_run(lambda events: llm.call(messages))
@@ -0,0 +1,126 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from src.api.chromadb_api import (
+    RETRIEVAL_CANDIDATE_FACTOR,
+    fuse_hits,
+    keyword_search,
+    resolve_filters,
+    retrieval_cache,
+    retrieval_cache_key,
+    vector_search,
+)
+from src.api.context_packer import DEFAULT_CONTEXT_TOKEN_BUDGET, pack_context
+from src.agents.web_search_agent import search_web
+from src.utils.chunking import count_tokens
+
+# Seconds each source may take before the answer is built without it
+SOURCE_TIMEOUTS = {
+    "vector": float(os.getenv("HYBRID_VECTOR_TIMEOUT", "5")),
+    "keyword": float(os.getenv("HYBRID_KEYWORD_TIMEOUT", "2")),
+    "web": float(os.getenv("HYBRID_WEB_TIMEOUT", "8")),
+}
+
+# One pool per source, shared by all sessions, so slow web calls never hold
+# the threads local searches need. Sources of one query run side by side.
+_source_pools = {
+    name: ThreadPoolExecutor(
+        max_workers=int(os.getenv(f"HYBRID_{name.upper()}_WORKERS", "4")), thread_name_prefix=f"hybrid-{name}"
+    )
+    for name in SOURCE_TIMEOUTS
+}
+
+
+def _collect(futures, timeouts):
+    """
+    Wait for each source's future until its own deadline, measured from now.
+
+    Returns:
+        dict: Source name to result, or None if it failed or timed out.
+    """
+    start = time.monotonic()
+    results = {}
+    for name, future in futures.items():
+        remaining = max(0.0, start + timeouts[name] - time.monotonic())
+        try:
+            results[name] = future.result(timeout=remaining)
+        except TimeoutError:
+            print(f"Hybrid search: {name} search timed out after {timeouts[name]}s")
+            # Only drops a search still queued; a running one finishes in the
+            # background, which is why the web search gets its own deadline
+            future.cancel()
+            results[name] = None
+        except Exception as e:
+            print(f"Hybrid search: {name} search failed: {e}")
+            results[name] = None
+    return results
+
+
+def _pack_web_results(results, token_budget):
+    """Format web results as context sections within `token_budget`."""
+    parts = []
+    references = []
+    used = 0
+    for result in results:
+        if "error" in result:
+            continue
+        block = f"Reference: web: {result['title']}, link: {result['link']}\n{result['snippet']}"
+        tokens = count_tokens(block)
+        if used + tokens > token_budget:
+            break
+        parts.append(block)
+        references.append({"file_name": result["title"], "location": result["link"], "chunk_ids": [], "tokens": tokens})
+        used += tokens
+    return "\n\n".join(parts), references
+
+
+def retrieve_hybrid_context(query, top_k=5, token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET, filters=None, timeouts=None):
+    """
+    Retrieve local and web context for a query concurrently.
+
+    Vector search, BM25 keyword search and the web search run on their own
+    thread pools, each bounded by its own timeout, so latency follows the
+    slowest source that answers in time rather than the sum. The web search,
+    including its retries, is given its timeout as a total deadline. Sources that fail or
+    time out are left out. Web snippets get at most a third of the budget.
+
+    Args:
+        query (str): User query.
+        top_k (int): Number of local chunks to keep after fusion.
+        token_budget (int): Maximum number of tokens in the packed text.
+        filters (dict): Optional local retrieval scope, see `normalize_filters`.
+        timeouts (dict): Per-source timeouts overriding `SOURCE_TIMEOUTS`.
+
+    Returns:
+        dict: {"text": str, "references": list[dict]}, as `retrieve_context`;
+        web references use the result title and link.
+    """
+    timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+    futures = {"web": _source_pools["web"].submit(search_web, query, timeout=timeouts["web"])}
+
+    cache_key = retrieval_cache_key(query, top_k, filters)
+    local_hits = retrieval_cache.get(cache_key)
+    if local_hits is None:
+        where, allowed_ids = resolve_filters(filters)
+        if allowed_ids is not None and not allowed_ids:
+            local_hits = []
+        else:
+            n_candidates = top_k * RETRIEVAL_CANDIDATE_FACTOR
+            futures["vector"] = _source_pools["vector"].submit(vector_search, query, n_candidates, where)
+            futures["keyword"] = _source_pools["keyword"].submit(keyword_search, query, n_candidates, allowed_ids)
+
+    results = _collect(futures, timeouts)
+
+    if local_hits is None:
+        local_hits = fuse_hits(results["vector"] or [], results["keyword"] or [], top_k)
+        if results["vector"] is not None and results["keyword"] is not None:
+            retrieval_cache.set(cache_key, local_hits)
+
+    web_text, web_references = _pack_web_results(results["web"] or [], token_budget // 3)
+    local_context = pack_context(local_hits, token_budget=token_budget - count_tokens(web_text))
+    print("most relevant docs", [hit["id"] for hit in local_hits], "web results", len(web_references))
+
+    return {
+        "text": "\n\n".join(part for part in (local_context["text"], web_text) if part),
+        "references": local_context["references"] + web_references,
+    }
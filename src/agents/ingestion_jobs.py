@@ -0,0 +1,169 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from src.agents.content_agent import (
+    count_pdf_pages,
+    count_pptx_slides,
+    extract_image,
+    extract_pdf_range,
+    extract_pptx_range,
+)
+from src.api.manifest import content_hash
+from src.utils.pipeline import run_stage
+
+ACTIVE_STATUSES = ("Queued", "Ingesting")
+INGESTION_KINDS = ("pdf", "pptx", "image")
+
+# Pages or slides parsed per task on the extraction process pool
+EXTRACT_RANGE_SIZE = int(os.getenv("INGEST_RANGE_SIZE", "8"))
+
+
+def default_ingest_processes():
+    """
+    Size of the extraction process pool: half the cores, so together with
+    the OCR pool (the other half) parsing and OCR never oversubscribe the
+    machine. Override with INGEST_MAX_PROCESSES.
+    """
+    return int(os.getenv("INGEST_MAX_PROCESSES", "0")) or max(1, (os.cpu_count() or 2) // 2)
+
+
+class IngestionScheduler:
+    """
+    Run file ingestion jobs in the background.
+
+    PDF and PowerPoint parsing is CPU-bound and holds the GIL, so it runs on
+    a process pool, a few pages or slides per task. Each job's worker thread
+    streams the parsed ranges through a bounded queue into chunking and
+    embedding, with at most `ranges_in_flight` ranges pending, so parsing
+    overlaps with embedding, batches use every extraction process and memory
+    stays flat regardless of document size. Each job keeps a status dict
+    that the UI can poll with `jobs()`.
+    """
+
+    def __init__(self, content_agent, max_processes=None, max_threads=4, ranges_in_flight=4):
+        self.content_agent = content_agent
+        self.ranges_in_flight = ranges_in_flight
+        self._process_pool = ProcessPoolExecutor(max_workers=max_processes or default_ingest_processes())
+        self._thread_pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="ingest")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, file_name, data, kind):
+        """
+        Queue a file for ingestion.
+
+        The file is spooled to a temporary file, which worker processes read
+        from, so queued jobs do not keep their contents in memory.
+
+        Args:
+            file_name (str): Name the document is stored under.
+            data (bytes): Raw file contents.
+            kind (str): "pdf", "pptx" or "image".
+
+        Returns:
+            str: Job ID.
+        """
+        if kind not in INGESTION_KINDS:
+            raise ValueError(f"Unsupported file type '{kind}'.")
+
+        with tempfile.NamedTemporaryFile(prefix="ingest-", suffix=f".{kind}", delete=False) as f:
+            f.write(data)
+            path = f.name
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "name": file_name,
+            "kind": kind,
+            "status": "Queued",
+            "progress": 0.0,
+            "message": "",
+            "submitted_at": time.time(),
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+
+        self._thread_pool.submit(self._ingest, job_id, path, content_hash(data))
+        return job_id
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _extract_ranges(self, extract, path, total):
+        """
+        Yield the units of a file parsed range by range on the process pool,
+        in order, keeping at most `ranges_in_flight` ranges pending.
+        """
+        in_flight = deque()
+        try:
+            for first in range(1, total + 1, EXTRACT_RANGE_SIZE):
+                in_flight.append(self._process_pool.submit(extract, path, first, first + EXTRACT_RANGE_SIZE - 1))
+                if len(in_flight) >= self.ranges_in_flight:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def _ingest(self, job_id, path, file_hash):
+        job = self.get(job_id)
+        self._update(job_id, status="Ingesting")
+        try:
+            if job["kind"] == "pdf":
+                def report_progress(page_num, total_pages):
+                    self._update(job_id, progress=page_num / max(total_pages, 1))
+
+                total_pages = self._process_pool.submit(count_pdf_pages, path).result()
+                message = self.content_agent.ingest_pdf_pages(
+                    job["name"],
+                    run_stage(self._extract_ranges(extract_pdf_range, path, total_pages), maxsize=4, name="pdf-extract"),
+                    total_pages,
+                    file_hash=file_hash,
+                    progress_callback=report_progress,
+                )
+            elif job["kind"] == "pptx":
+                total_slides = self._process_pool.submit(count_pptx_slides, path).result()
+                message = self.content_agent.ingest_pptx_slides(
+                    job["name"],
+                    run_stage(self._extract_ranges(extract_pptx_range, path, total_slides), maxsize=4, name="pptx-extract"),
+                    file_hash=file_hash,
+                )
+            else:
+                with open(path, "rb") as f:
+                    message = self.content_agent.ingest_image(job["name"], extract_image(f.read()), file_hash=file_hash)
+        except Exception as e:
+            self._update(job_id, status="Failed", progress=1.0, message=f"Error processing '{job['name']}': {e}")
+            return
+        finally:
+            os.remove(path)
+
+        self._update(job_id, status="Processed", progress=1.0, message=message)
+
+    def get(self, job_id):
+        """Return a copy of one job's status dict."""
+        with self._lock:
+            return dict(self._jobs[job_id])
+
+    def jobs(self):
+        """Return copies of all job status dicts, oldest first."""
+        with self._lock:
+            return sorted((dict(job) for job in self._jobs.values()), key=lambda job: job["submitted_at"])
+
+    def has_active_jobs(self):
+        with self._lock:
+            return any(job["status"] in ACTIVE_STATUSES for job in self._jobs.values())
+
+    def clear_finished(self):
+        """Forget jobs that are no longer running."""
+        with self._lock:
+            self._jobs = {job_id: job for job_id, job in self._jobs.items() if job["status"] in ACTIVE_STATUSES}
+
+    def shutdown(self):
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        self._process_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,99 @@
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from src.utils.disk_cache import DiskLRUCache
+
+# Images smaller than this (icons, bullets, logos) are not worth sending to Tesseract
+MIN_OCR_IMAGE_BYTES = 2048
+
+
+def ocr_image(data, lang="eng"):
+    """
+    Run Tesseract on encoded image bytes and return the recognized text.
+
+    Module-level and free of shared state so it can run in a worker process.
+    """
+    import pytesseract
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        return pytesseract.image_to_string(image, lang=lang).strip()
+
+
+def default_ocr_workers():
+    """
+    Size of the OCR process pool: half the cores, so OCR leaves room for the
+    embedding model and Whisper, which use all cores through torch's own
+    thread pool. Override with OCR_MAX_WORKERS.
+    """
+    return int(os.getenv("OCR_MAX_WORKERS", "0")) or max(1, (os.cpu_count() or 2) // 2)
+
+
+class OCRService:
+    """
+    Recognize text in images on a process pool, caching results by image hash.
+
+    Recognized text is stored in an on-disk LRU cache under the SHA-256 of
+    the OCR language and the image bytes, so re-ingesting a document (or the
+    same picture in another deck) never runs Tesseract twice. Identical
+    images submitted while one is still being processed share the same
+    future.
+    """
+
+    def __init__(self, cache_dir, max_workers=None, lang="eng", max_cache_bytes=64 * 1024 * 1024):
+        self.lang = lang
+        self.cache = DiskLRUCache(cache_dir, max_bytes=max_cache_bytes)
+        self._pool = ProcessPoolExecutor(max_workers=max_workers or default_ocr_workers())
+        self._lock = threading.Lock()
+        self._in_flight = {}  # cache key -> Future
+
+    def make_key(self, data):
+        digest = hashlib.sha256(f"{self.lang}\0".encode("utf-8"))
+        digest.update(data)
+        return f"{digest.hexdigest()}.txt"
+
+    def _store(self, key, future):
+        try:
+            if not future.cancelled() and future.exception() is None:
+                self.cache.put(key, future.result().encode("utf-8"))
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def submit(self, data):
+        """Return a Future of the text in the encoded image `data`."""
+        key = self.make_key(data)
+        cached = self.cache.get(key)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached.decode("utf-8"))
+            return future
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._pool.submit(ocr_image, data, self.lang)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda f: self._store(key, f))
+        return future
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def join_ocr_results(futures):
+    """Wait for OCR futures and join their non-empty texts; failures are logged and skipped."""
+    texts = []
+    for future in futures:
+        try:
+            text = future.result()
+        except Exception as e:
+            print(f"Error running OCR: {e}")
+            continue
+        if text:
+            texts.append(text)
+    return "\n\n".join(texts)
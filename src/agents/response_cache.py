@@ -0,0 +1,89 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def context_fingerprint(search_mode, chunk_ids=()):
+    """
+    Fingerprint the context an answer was based on: the search mode and
+    the set of retrieved chunk IDs.
+    """
+    digest = hashlib.sha256()
+    digest.update(search_mode.encode("utf-8"))
+    for chunk_id in sorted(chunk_ids):
+        digest.update(b"\0")
+        digest.update(chunk_id.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SemanticResponseCache:
+    """
+    Cache of generated answers, matched by query embedding similarity.
+
+    A cached answer is reused when a new query's embedding has cosine
+    similarity of at least `similarity_threshold` with an earlier one and
+    both the agent type and the context fingerprint are identical. Entries
+    expire after `ttl_seconds` and are evicted least-recently-used beyond
+    `max_entries`.
+    """
+
+    def __init__(self, similarity_threshold=0.95, max_entries=500, ttl_seconds=3600):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # entry ID -> entry dict, oldest access first
+        self._next_id = 0
+
+    @staticmethod
+    def _normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, query_embedding, fingerprint, agent_type):
+        """Return the cached entry (dict with "answer" and "references") or None."""
+        query = self._normalize(query_embedding)
+        now = time.monotonic()
+        with self._lock:
+            for entry_id in [i for i, e in self._entries.items() if e["expires_at"] < now]:
+                del self._entries[entry_id]
+
+            candidates = [
+                (entry_id, entry) for entry_id, entry in self._entries.items()
+                if entry["fingerprint"] == fingerprint and entry["agent_type"] == agent_type
+                and entry["embedding"].shape == query.shape
+            ]
+            if candidates:
+                similarities = np.stack([entry["embedding"] for _, entry in candidates]) @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    entry_id, entry = candidates[best]
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return entry
+            self.misses += 1
+            return None
+
+    def store(self, query_embedding, fingerprint, agent_type, answer, references=None):
+        with self._lock:
+            self._entries[self._next_id] = {
+                "embedding": self._normalize(query_embedding),
+                "fingerprint": fingerprint,
+                "agent_type": agent_type,
+                "answer": answer,
+                "references": references or [],
+                "expires_at": time.monotonic() + self.ttl_seconds,
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,47 @@
+from src.api.llm_stream import stream_llm_run
+
+# crewai agents write their reasoning ("Thought:", "Action:", "Action Input:")
+# as plain text before this marker; only what follows it is the answer
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+def stream_crew(crew):
+    """
+    Run `crew.kickoff()` on a background thread and yield its progress.
+
+    Tokens are only passed on once the running task's agent has written
+    `FINAL_ANSWER_MARKER`, so the reasoning and tool calls leading up to
+    its answer are not shown or spoken.
+
+    Yields:
+        tuple: ("token", str) for each token of a task's final answer,
+        ("task", TaskOutput) when a task finishes, and finally
+        ("result", CrewOutput).
+    """
+    previous_callback = crew.task_callback
+
+    def run(events):
+        def on_task_done(output):
+            events.put(("task", output))
+            if previous_callback:
+                previous_callback(output)
+
+        crew.task_callback = on_task_done
+        return crew.kickoff()
+
+    reasoning = ""
+    answering = False
+    for kind, payload in stream_llm_run(run):
+        if kind == "token" and not answering:
+            reasoning += payload
+            marker_at = reasoning.find(FINAL_ANSWER_MARKER)
+            if marker_at < 0:
+                continue
+            answering = True
+            payload = reasoning[marker_at + len(FINAL_ANSWER_MARKER):].lstrip()
+            if not payload:
+                continue
+        elif kind == "task":
+            reasoning = ""
+            answering = False
+        yield kind, payload
@@ -1,13 +1,136 @@
 import os
+import threading
+import time
 import requests
 from crewai.tools import BaseTool
 from typing import Type
 from crewai import Agent, Task
 from pydantic import BaseModel, Field
+from requests.adapters import HTTPAdapter
+from src.utils.cache import TTLCache
+from src.utils.rate_limit import TokenBucket
 
 google_api_key = os.getenv("GOOGLE_API_KEY")
 search_engine_id = os.getenv("SEARCH_ENGINE_ID")
 
+# Google Custom Search by default; point at src/api/mock_search_server.py for offline tests
+search_url = os.getenv("WEB_SEARCH_URL", "https://www.googleapis.com/customsearch/v1")
+# Total seconds a search may take, including rate-limit waits and retries
+search_timeout = float(os.getenv("WEB_SEARCH_TIMEOUT", "10"))
+# Connect timeout of a single attempt, in seconds
+SEARCH_CONNECT_TIMEOUT = 3.05
+# Retries after a connection error, a 429 or a 5xx response
+SEARCH_MAX_RETRIES = int(os.getenv("WEB_SEARCH_RETRIES", "3"))
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Results are cached on the normalized query, since delegating agents often repeat searches
+search_cache = TTLCache(
+    max_entries=int(os.getenv("WEB_SEARCH_CACHE_SIZE", "256")),
+    ttl_seconds=int(os.getenv("WEB_SEARCH_CACHE_TTL", "900")),
+)
+# Requests per second sent to the search API, with bursts up to WEB_SEARCH_BURST
+search_rate_limiter = TokenBucket(
+    rate=float(os.getenv("WEB_SEARCH_RATE", "2")),
+    capacity=float(os.getenv("WEB_SEARCH_BURST", "5")),
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_search_session():
+    """
+    Return the shared HTTP session with pooled connections.
+
+    The session does not retry on its own: `search_web` retries so that every
+    attempt goes through the rate limiter and stays within its deadline.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+                session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+                _session = session
+    return _session
+
+
+def _retry_delay(response, attempt):
+    """Seconds to wait before the next attempt: Retry-After if given, else exponential backoff."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.strip().isdigit():
+        return float(retry_after)
+    return 0.5 * 2 ** attempt
+
+
+def search_web(query, num_results=5, timeout=None):
+    """
+    Search the web, serving repeated queries from the result cache.
+
+    Connection errors, 429 and 5xx responses are retried with backoff. Each
+    attempt first takes a token from `search_rate_limiter`, and waiting for
+    tokens, requests and backoff together never exceed `timeout`.
+
+    Args:
+        query (str): Search phrase.
+        num_results (int): Maximum number of results.
+        timeout (float): Total seconds the search may take; defaults to
+            WEB_SEARCH_TIMEOUT.
+
+    Returns:
+        list[dict]: Results with "title", "snippet" and "link", or a single
+        {"error": ...} entry. Errors are not cached.
+    """
+    key = (" ".join(query.lower().split()), num_results)
+    results = search_cache.get(key)
+    if results is not None:
+        return results
+
+    deadline = time.monotonic() + (search_timeout if timeout is None else timeout)
+    params = {
+        "key": google_api_key,
+        "cx": search_engine_id,
+        "q": query,
+        "num": num_results
+    }
+    response = None
+    error = "timed out"
+    for attempt in range(SEARCH_MAX_RETRIES + 1):
+        if not search_rate_limiter.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            return [{"error": "Error fetching search results: rate limit exceeded, try again later."}]
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        response = None
+        try:
+            response = get_search_session().get(
+                search_url, params=params, timeout=(min(SEARCH_CONNECT_TIMEOUT, remaining), remaining)
+            )
+        except requests.RequestException as e:
+            error = str(e)
+        else:
+            if response.status_code == 200:
+                break
+            error = response.text
+            if response.status_code not in _RETRY_STATUSES:
+                return [{"error": f"Error fetching search results: {error}"}]
+
+        delay = _retry_delay(response, attempt)
+        if attempt == SEARCH_MAX_RETRIES or time.monotonic() + delay >= deadline:
+            break
+        time.sleep(delay)
+
+    if response is None or response.status_code != 200:
+        return [{"error": f"Error fetching search results: {error}"}]
+
+    items = response.json().get("items", [])
+    results = [{"title": item["title"], "snippet": item["snippet"], "link": item["link"]} for item in items]
+    search_cache.set(key, results)
+    return results
+
+
 class WebSearchToolInput(BaseModel):
     """Input schema for MyCustomTool."""
     input: str = Field(..., description="input to query")
@@ -19,21 +142,8 @@ class WebSearchTool(BaseTool):
     )
     args_schema: Type[BaseModel] = WebSearchToolInput
 
-    def _run(self, input: str) -> str:
-        # Implementation goes here
-        url = f"https://www.googleapis.com/customsearch/v1"
-        params = {
-            "key": google_api_key,
-            "cx": search_engine_id,
-            "q": input,
-            "num": 5
-        }
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            results = response.json().get("items", [])
-            return [{"title": item["title"], "snippet": item["snippet"], "link": item["link"]} for item in results]
-        else:
-            return [{"error": f"Error fetching search results: {response.text}"}]
+    def _run(self, input: str) -> list[dict]:
+        return search_web(input, num_results=5)
 
 
 
@@ -1,52 +1,348 @@
 import chromadb
 import os
-from langchain_openai import OpenAIEmbeddings
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import wraps
+from itertools import islice
+from src.api.context_packer import DEFAULT_CONTEXT_TOKEN_BUDGET, pack_context
+from src.api.document_catalog import POSITION_KEYS, DocumentCatalog
+from src.api.embedding_cache import CachedEmbeddings, EmbeddingCache
+from src.api.embeddings import collection_name_for, create_embedding_backend, resolve_embedding_config
+from src.api.keyword_index import BM25Index, reciprocal_rank_fusion
+from src.utils.cache import TTLCache
 
 
 persist_directory = "../../data"
-if not os.path.exists(persist_directory):
+
+# Embedding backend is chosen with EMBEDDING_BACKEND ("openai" or "sentence-transformers")
+embedding_backend_name, embedding_model_name = resolve_embedding_config()
+
+# Documents can be split into separate workspaces (WORKSPACE), each with its own
+# collection, so searches only cover the workspace's vectors
+workspace = re.sub(r"[^a-zA-Z0-9]+", "-", os.getenv("WORKSPACE", "")).strip("-").lower()
+
+# Each embedding backend writes to its own collection
+collection_name = collection_name_for(
+    f"new_collection_{workspace}" if workspace else "new_collection", embedding_backend_name, embedding_model_name
+)
+
+_init_lock = threading.RLock()
+
+# Cache of retrieval results, keyed on normalized query, top_k and collection generation
+retrieval_cache = TTLCache(
+    max_entries=int(os.getenv("RETRIEVAL_CACHE_SIZE", "256")),
+    ttl_seconds=int(os.getenv("RETRIEVAL_CACHE_TTL", "600")),
+)
+_collection_generation = 0
+
+
+def _on_collection_changed():
+    """Invalidate cached retrievals after the collection was modified."""
+    global _collection_generation
+    _collection_generation += 1
+    retrieval_cache.clear()
+
+
+def _lazy_singleton(factory):
+    """Build the resource returned by `factory` once per process, on first use."""
+    instance = None
+
+    @wraps(factory)
+    def getter():
+        nonlocal instance
+        if instance is None:
+            with _init_lock:
+                if instance is None:
+                    instance = factory()
+        return instance
+
+    return getter
+
+
+@_lazy_singleton
+def get_client():
     os.makedirs(persist_directory, exist_ok=True)
+    return chromadb.PersistentClient(persist_directory)
+
+
+@_lazy_singleton
+def get_collection():
+    return get_client().get_or_create_collection(
+        name=collection_name,
+        metadata={"embedding_backend": embedding_backend_name, "embedding_model": embedding_model_name},
+    )
+
+
+@_lazy_singleton
+def get_embedding_cache():
+    # Embeddings are cached on disk, keyed by model name and normalized text;
+    # EMBEDDING_CACHE_MAX_MB caps the cache across all embedding models
+    return EmbeddingCache(
+        os.path.join(persist_directory, "embedding_cache"),
+        max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_MB", "512")) * 1024 * 1024,
+    )
+
 
+@_lazy_singleton
+def get_embedding_model():
+    backend = create_embedding_backend(embedding_backend_name, embedding_model_name)
+    return CachedEmbeddings(backend, get_embedding_cache(), model_name=f"{backend.name}/{backend.model_name}")
 
 
-client = chromadb.PersistentClient(persist_directory)
+@_lazy_singleton
+def get_document_catalog():
+    # One catalog per collection, since chunk IDs are per collection
+    catalog = DocumentCatalog(os.path.join(persist_directory, "catalog", f"{collection_name}.sqlite3"))
+    if catalog.is_empty():
+        # First run: index what is already stored
+        stored = get_collection().get(include=["documents", "metadatas"])
+        catalog.add_chunks(
+            {"content": doc or "", "metadata": {**meta, "unique_id": doc_id}}
+            for doc_id, doc, meta in zip(stored["ids"], stored["documents"], stored["metadatas"])
+        )
+    if catalog.get_setting("ingested_at_backfilled") is None:
+        _backfill_ingested_at(catalog)
+        catalog.set_setting("ingested_at_backfilled", "1")
+    return catalog
 
-collection_name = "new_collection"
-collection = client.get_or_create_collection(name=collection_name)
-embedding_model = OpenAIEmbeddings()
 
-def add_document_to_chromadb(chunks=None, content=None, metadata=None):
+def _backfill_ingested_at(catalog, page_size=1000):
+    """
+    Copy ingest times from the catalog into the metadata of chunks stored
+    before they were written to the collection, so date filters select the
+    same chunks in dense and keyword search.
+    """
+    collection = get_collection()
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            return
+        missing = {
+            doc_id: meta or {}
+            for doc_id, meta in zip(page["ids"], page["metadatas"])
+            if "ingested_at" not in (meta or {})
+        }
+        times = catalog.ingest_times(missing)
+        if times:
+            collection.update(
+                ids=list(times),
+                metadatas=[{**missing[doc_id], "ingested_at": ingested_at} for doc_id, ingested_at in times.items()],
+            )
+        offset += len(page["ids"])
+
+
+@_lazy_singleton
+def get_keyword_index():
+    # BM25 index mirroring the collection, one per collection
+    path = os.path.join(persist_directory, "keyword_index", f"{collection_name}.pkl")
+    index = BM25Index(path)
+    if not index.load() or len(index) != get_collection().count():
+        # First run, or the process stopped before the index of written
+        # chunks was saved: build the index from what is stored
+        index = BM25Index(path)
+        stored = get_collection().get(include=["documents"])
+        if stored["ids"]:
+            index.add(stored["ids"], stored["documents"])
+        index.save()
+    return index
+
+
+# Number of chunks embedded per request and written per collection.add call
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# Maximum number of embedding batches in flight at the same time
+EMBED_MAX_WORKERS = int(os.getenv("EMBED_MAX_WORKERS", "4"))
+
+
+def _iter_batches(chunks, batch_size):
+    """Yield lists of at most `batch_size` chunks from any iterable."""
+    iterator = iter(chunks)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _embed_batch(batch):
+    """Embed a batch of chunks with a single embedding request."""
+    return get_embedding_model().embed_documents([chunk["content"] for chunk in batch])
+
+
+def _write_batch(batch, embeddings):
+    """Write an embedded batch to the collection in one call."""
+    ingested_at = time.time()
+    for chunk in batch:
+        chunk["metadata"]["ingested_at"] = ingested_at
+    get_collection().upsert(
+        ids=[chunk["metadata"]["unique_id"] for chunk in batch],
+        documents=[chunk["content"] for chunk in batch],
+        metadatas=[chunk["metadata"] for chunk in batch],
+        embeddings=embeddings
+    )
+    get_keyword_index().add(
+        [chunk["metadata"]["unique_id"] for chunk in batch],
+        [chunk["content"] for chunk in batch],
+    )
+    get_document_catalog().add_chunks(batch)
+    _on_collection_changed()
+
+
+def add_chunks_in_batches(chunks, batch_size=EMBED_BATCH_SIZE, max_workers=EMBED_MAX_WORKERS, on_batch_written=None):
+    """
+    Embed and store chunks in batches, with a bounded number of batches in flight.
+
+    Chunks are consumed lazily, so `chunks` can be a list or a generator.
+    Embedding requests run on a thread pool; each finished batch is written
+    to the collection with a single `collection.upsert` call.
+
+    Args:
+        chunks (Iterable[dict]): Dictionaries containing "content" and "metadata".
+        batch_size (int): Number of chunks per embedding request / write.
+        max_workers (int): Maximum number of concurrent embedding requests.
+        on_batch_written (callable): Optional callback invoked with each batch
+            after it has been written, on the calling thread.
+
+    Returns:
+        int: Number of chunks written.
+    """
+    start = time.perf_counter()
+    written = 0
+    in_flight = {}
+
+    def drain(return_when):
+        nonlocal written
+        done, _ = wait(in_flight, return_when=return_when)
+        for future in done:
+            batch = in_flight.pop(future)
+            _write_batch(batch, future.result())
+            written += len(batch)
+            if on_batch_written:
+                on_batch_written(batch)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for batch in _iter_batches(chunks, batch_size):
+                if len(in_flight) >= max_workers:
+                    drain(FIRST_COMPLETED)
+                in_flight[executor.submit(_embed_batch, batch)] = batch
+            while in_flight:
+                drain(FIRST_COMPLETED)
+    finally:
+        # Batches already in the collection and catalog must reach the
+        # saved index even if a later batch fails
+        if written:
+            get_keyword_index().save()
+            get_embedding_cache().flush()
+
+    elapsed = time.perf_counter() - start
+    rate = written / elapsed if elapsed > 0 else 0.0
+    print(f"Ingested {written} chunks in {elapsed:.2f}s ({rate:.1f} chunks/sec)")
+    print("Embedding cache", get_embedding_cache().stats())
+    return written
+
+
+def embed_query(text):
+    """
+    Embed a query with the configured (cached) embedding model.
+    """
+    return get_embedding_model().embed_query(text)
+
+
+def get_embedding_cache_stats():
+    """
+    Return hit/miss counters and size of the embedding cache.
+    """
+    return get_embedding_cache().stats()
+
+
+def sync_document_chunks(file_name, chunks, file_hash=None, on_batch_written=None):
+    """
+    Incrementally (re-)ingest the chunks of one document.
+
+    Chunk IDs are content-derived, so only chunks whose ID is not yet in
+    the document catalog are embedded and upserted, and IDs that vanished
+    from the new version are deleted. If `file_hash` matches the catalog,
+    the document is unchanged and nothing is done.
+
+    Args:
+        file_name (str): Name of the document the chunks belong to.
+        chunks (Iterable[dict]): Dictionaries containing "content" and "metadata".
+        file_hash (str): Hash of the source file, used to skip unchanged files.
+        on_batch_written (callable): Optional progress callback, called with each written batch of chunks.
+
+    Returns:
+        str: Summary of what changed.
+    """
+    catalog = get_document_catalog()
+    document = catalog.get_document(file_name)
+    if document and file_hash and document["file_hash"] == file_hash:
+        return f"{file_name} is unchanged, nothing to update."
+
+    previous_ids = set(catalog.chunk_ids(file_name))
+
+    current_ids = []
+
+    def changed_chunks():
+        for chunk in chunks:
+            chunk_id = chunk["metadata"]["unique_id"]
+            current_ids.append(chunk_id)
+            if chunk_id not in previous_ids:
+                yield chunk
+
+    added = add_chunks_in_batches(changed_chunks(), on_batch_written=on_batch_written)
+
+    vanished = list(previous_ids.difference(current_ids))
+    if vanished:
+        get_collection().delete(ids=vanished)
+        get_keyword_index().remove(vanished)
+        get_keyword_index().save()
+        catalog.remove_chunks(vanished)
+        _on_collection_changed()
+
+    catalog.set_file_hash(file_name, file_hash)
+    unchanged = len(current_ids) - added
+    return f"{file_name}: {added} chunks added, {len(vanished)} removed, {unchanged} unchanged."
+
+
+def add_document_to_chromadb(chunks=None, content=None, metadata=None, on_batch_written=None, file_name=None, file_hash=None):
     """
     Add content or pre-chunked data to ChromaDB.
 
     Args:
-        chunks (list[dict]): List of dictionaries, each containing "content" and "metadata".
+        chunks (Iterable[dict]): List or generator of dictionaries, each containing "content" and "metadata".
         content (str): Raw text content to be stored.
         metadata (dict): Metadata associated with the raw content.
+        on_batch_written (callable): Optional progress callback, called with each written batch of chunks.
+        file_name (str): Document the chunks belong to; enables incremental re-ingestion.
+        file_hash (str): Hash of the source file, used to skip unchanged documents.
 
     Returns:
         str: Success or error message.
     """
     try:
-        if chunks:
-            # Add pre-chunked content to ChromaDB
-            for chunk in chunks:
-                embedding = embedding_model.embed_query(chunk["content"])
-                collection.add(
-                    ids=[chunk["metadata"]["unique_id"]],
-                    documents=[chunk["content"]],
-                    metadatas=[chunk["metadata"]],
-                    embeddings=[embedding]
-                )
+        if chunks and file_name:
+            # Only embed chunks that changed since the last ingestion of this document
+            return sync_document_chunks(file_name, chunks, file_hash=file_hash, on_batch_written=on_batch_written)
+        elif chunks:
+            # Add pre-chunked content to ChromaDB in batches
+            add_chunks_in_batches(chunks, on_batch_written=on_batch_written)
         elif content and metadata:
             # Add raw content with metadata
-            embedding = embedding_model.embed_query(content)
-            collection.add(
+            metadata = {**metadata, "ingested_at": time.time()}
+            embedding = get_embedding_model().embed_query(content)
+            get_collection().add(
                 ids=[metadata["unique_id"]],
                 documents=[content],
                 metadatas=[metadata],
                 embeddings=[embedding]
             )
+            get_keyword_index().add([metadata["unique_id"]], [content])
+            get_keyword_index().save()
+            get_document_catalog().add_chunks([{"content": content, "metadata": metadata}])
+            _on_collection_changed()
         else:
             raise ValueError("Either chunks or content with metadata must be provided.")
 
@@ -56,69 +352,253 @@ def add_document_to_chromadb(chunks=None, content=None, metadata=None):
 
 
 
-def retrieve_relevant_docs_from_chromadb(query, top_k=5):
+# Number of candidates taken from each retriever before fusion, per requested result
+RETRIEVAL_CANDIDATE_FACTOR = 3
+
+
+def normalize_filters(filters):
+    """
+    Drop empty retrieval filters and make the rest hashable.
+
+    `filters` is a dict (or already normalized pairs). Supported keys are
+    "file_names" and "types" (iterables of str), "position_range"
+    (inclusive (first, last) page/slide range of PDF and PowerPoint chunks) and "ingested_after" /
+    "ingested_before" (Unix timestamps).
+
+    Returns:
+        tuple: Sorted (key, value) pairs, empty when nothing is filtered.
+    """
+    normalized = []
+    for key, value in dict(filters or ()).items():
+        if value is None or value == "" or (isinstance(value, (list, tuple, set, frozenset)) and not value):
+            continue
+        if key in ("file_names", "types"):
+            value = tuple(sorted(value))
+        elif key == "position_range":
+            value = (int(value[0]), int(value[1]))
+        elif key in ("ingested_after", "ingested_before"):
+            value = float(value)
+        else:
+            raise ValueError(f"Unknown retrieval filter: {key}")
+        normalized.append((key, value))
+    return tuple(sorted(normalized))
+
+
+def build_where_clause(filters):
+    """
+    Translate normalized retrieval filters into a ChromaDB `where` clause.
+
+    Returns:
+        dict | None: The clause, or None when nothing is filtered.
+    """
+    conditions = []
+    for key, value in filters:
+        if key == "file_names":
+            conditions.append({"file_name": {"$in": list(value)}})
+        elif key == "types":
+            conditions.append({"type": {"$in": list(value)}})
+        elif key == "position_range":
+            first, last = value
+            conditions.append({"$or": [
+                {"$and": [{"type": doc_type}, {position_key: {"$gte": first}}, {position_key: {"$lte": last}}]}
+                for doc_type, position_key in POSITION_KEYS.items()
+            ]})
+        elif key == "ingested_after":
+            conditions.append({"ingested_at": {"$gte": value}})
+        elif key == "ingested_before":
+            conditions.append({"ingested_at": {"$lt": value}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def vector_search(query, n_results, where=None):
+    """
+    Dense search over the collection, optionally restricted by a `where` clause.
+
+    Returns:
+        list[dict]: Hits with "id", "document" and "metadata", best first.
+    """
     # Embed the query
-    query_embedding = embedding_model.embed_query(query)
+    query_embedding = get_embedding_model().embed_query(query)
 
-    # Retrieve top-k relevant chunks
-    results = collection.query(query_embeddings=[query_embedding], n_results=top_k, include=["documents", "metadatas"])
-    print("most relevant docs", results)
+    results = get_collection().query(
+        query_embeddings=[query_embedding], n_results=n_results, where=where, include=["documents", "metadatas"]
+    )
+    if not results or not results.get("ids") or not results["ids"][0]:
+        return []
+    return [
+        {"id": doc_id, "document": doc, "metadata": meta}
+        for doc_id, doc, meta in zip(results["ids"][0], results["documents"][0], results["metadatas"][0])
+    ]
 
-    if not results or not results.get("documents") or not results.get("metadatas"):
-        return "no context"
-    
-  
-    # Flatten the list of documents and metadata
-    documents = [doc for sublist in results["documents"] for doc in sublist]
-    metadatas = [meta for sublist in results["metadatas"] for meta in sublist]
 
-    # Build context with references
-    context_with_references = []
-    for doc, meta in zip(documents, metadatas):
-        file_name = meta.get("file_name", "Unknown File")
-        page = meta.get("page_num", "Unknown Page")
-        context_with_references.append(f"Reference: file name: {file_name}, page: {page}\n{doc}")
+def keyword_search(query, n_results, allowed_ids=None):
+    """
+    BM25 keyword search over the local inverted index.
 
-    context = "\n\n".join(context_with_references)
+    Returns:
+        list[tuple[str, float]]: (chunk ID, score) pairs, best first.
+    """
+    return get_keyword_index().search(query, top_k=n_results, allowed_ids=allowed_ids)
 
-    return context
+
+def resolve_filters(filters):
+    """
+    Turn retrieval filters into what each retriever needs.
+
+    Returns:
+        tuple: (ChromaDB `where` clause or None, set of allowed chunk IDs for
+        keyword search or None when nothing is filtered).
+    """
+    filters = normalize_filters(filters)
+    if not filters:
+        return None, None
+    return build_where_clause(filters), set(get_document_catalog().filter_chunk_ids(**dict(filters)))
 
 
+def fuse_hits(dense_hits, keyword_hits, top_k):
+    """
+    Merge dense hits and BM25 (ID, score) pairs with reciprocal-rank fusion.
 
-def remove_document_from_chromadb(file_name, file_ids):
+    Returns:
+        list[dict]: Up to `top_k` hits with "id", "document" and "metadata".
     """
-    Remove all chunks of a file from ChromaDB using their IDs.
+    fused_ids = reciprocal_rank_fusion([
+        [hit["id"] for hit in dense_hits],
+        [doc_id for doc_id, _ in keyword_hits],
+    ])[:top_k]
+
+    hits_by_id = {hit["id"]: hit for hit in dense_hits}
+    missing = [doc_id for doc_id in fused_ids if doc_id not in hits_by_id]
+    if missing:
+        # Keyword-only hits: fetch their text and metadata from the collection
+        fetched = get_collection().get(ids=missing, include=["documents", "metadatas"])
+        for doc_id, doc, meta in zip(fetched["ids"], fetched["documents"], fetched["metadatas"]):
+            hits_by_id[doc_id] = {"id": doc_id, "document": doc, "metadata": meta}
+
+    return [hits_by_id[doc_id] for doc_id in fused_ids if doc_id in hits_by_id]
+
+
+def hybrid_search(query, top_k=5, filters=None):
+    """
+    Combine dense and BM25 results with reciprocal-rank fusion.
+
+    Filters (see `normalize_filters`) are pushed down into the ChromaDB
+    `where` clause for dense search and resolved to the allowed chunk IDs
+    through the document catalog for keyword search.
+
+    Returns:
+        list[dict]: Up to `top_k` hits with "id", "document" and "metadata".
+    """
+    where, allowed_ids = resolve_filters(filters)
+    if allowed_ids is not None and not allowed_ids:
+        return []
+
+    n_candidates = top_k * RETRIEVAL_CANDIDATE_FACTOR
+    dense_hits = vector_search(query, n_candidates, where=where)
+    keyword_hits = keyword_search(query, n_candidates, allowed_ids=allowed_ids)
+    return fuse_hits(dense_hits, keyword_hits, top_k)
+
+
+def retrieval_cache_key(query, top_k, filters=None):
+    """
+    Key of a search in `retrieval_cache`.
+
+    The key includes the filters and a generation counter bumped on every
+    collection change, so a search that races with an ingestion can never
+    store stale results.
+    """
+    return (" ".join(query.lower().split()), top_k, normalize_filters(filters), _collection_generation)
+
+
+def cached_hybrid_search(query, top_k=5, filters=None):
+    """
+    `hybrid_search` behind a TTL+LRU cache, see `retrieval_cache_key`.
+    """
+    key = retrieval_cache_key(query, top_k, filters)
+    hits = retrieval_cache.get(key)
+    if hits is None:
+        hits = hybrid_search(query, top_k=top_k, filters=filters)
+        retrieval_cache.set(key, hits)
+    return hits
+
+
+def retrieve_context(query, top_k=5, token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET, filters=None):
+    """
+    Retrieve, deduplicate and pack the context for a query.
+
+    Args:
+        filters (dict): Optional retrieval scope, see `normalize_filters`.
+
+    Returns:
+        dict: {"text": str, "references": list[dict]}, see `pack_context`.
+    """
+    # Retrieve top-k relevant chunks from dense and keyword search
+    hits = cached_hybrid_search(query, top_k=top_k, filters=filters)
+    print("most relevant docs", [hit["id"] for hit in hits])
+    return pack_context(hits, token_budget=token_budget)
+
+
+def retrieve_relevant_docs_from_chromadb(query, top_k=5, token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET, filters=None):
+    context = retrieve_context(query, top_k=top_k, token_budget=token_budget, filters=filters)
+    if not context["text"]:
+        return "no context"
+    return context["text"]
+
+
+
+def remove_document_from_chromadb(file_name, file_ids=None):
+    """
+    Remove all chunks of a file from ChromaDB.
+
+    The chunk IDs are looked up in the document catalog unless `file_ids` is given.
+    The catalog entry is dropped last, so a failed delete leaves the document
+    listed and the removal can be retried.
     """
     try:
-        # Flatten the list of IDs if it's nested
-        flat_file_ids = [item for sublist in file_ids for item in sublist] if isinstance(file_ids, list) and any(isinstance(i, list) for i in file_ids) else file_ids
-        
+        catalog = get_document_catalog()
+        if file_ids is None:
+            flat_file_ids = catalog.chunk_ids(file_name)
+        else:
+            # Flatten the list of IDs if it's nested
+            flat_file_ids = [item for sublist in file_ids for item in sublist] if isinstance(file_ids, list) and any(isinstance(i, list) for i in file_ids) else file_ids
+
         # Delete all IDs associated with the file
-        collection.delete(ids=flat_file_ids)
+        if flat_file_ids:
+            get_collection().delete(ids=flat_file_ids)
+            get_keyword_index().remove(flat_file_ids)
+            get_keyword_index().save()
+        catalog.remove_document(file_name)
+        _on_collection_changed()
         return f"All chunks of {file_name} have been removed from ChromaDB."
     except Exception as e:
         return f"Error removing file {file_name}: {str(e)}"
     
 
-def get_uploaded_documents():
+def get_uploaded_documents(name_filter=None):
     """
-    Retrieve all files currently stored in ChromaDB, grouped by file name.
+    List the files stored in ChromaDB from the document catalog.
+
+    Args:
+        name_filter (str): Only return files whose name contains this text (case-insensitive).
+
+    Returns:
+        list[dict]: One entry per file with "name", "status", "type",
+        "chunk_count", "total_chars" and "ingested_at".
     """
     try:
-        # Fetch documents and metadata from ChromaDB
-        documents = collection.get(include=["metadatas"])
-        
-        # Group documents by file name
-        file_map = {}
-        for meta, doc_id in zip(documents["metadatas"], documents["ids"]):
-            file_name = meta.get("file_name", "Unknown File")  # Fallback if file_name is missing
-            if file_name not in file_map:
-                file_map[file_name] = {"name": file_name, "status": "Processed", "ids": []}
-            file_map[file_name]["ids"].append(doc_id)
-        
-
-        # Convert file_map to a list
-        return list(file_map.values())
+        return [
+            {
+                "name": document["file_name"],
+                "status": "Processed",
+                "type": document["type"],
+                "chunk_count": document["chunk_count"],
+                "total_chars": document["total_chars"],
+                "ingested_at": document["ingested_at"],
+            }
+            for document in get_document_catalog().list_documents(name_filter)
+        ]
     except Exception as e:
         print(f"Error retrieving uploaded documents: {e}")
-        return []
\ No newline at end of file
+        return []
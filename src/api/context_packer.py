@@ -0,0 +1,127 @@
+import os
+import zlib
+
+import numpy as np
+
+from src.utils.chunking import count_tokens
+
+DEFAULT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+DEFAULT_DEDUP_THRESHOLD = 0.8
+
+_NUM_PERM = 64
+_SHINGLE_SIZE = 5
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(1234)
+_PERM_A = _rng.integers(1, (1 << 31) - 1, size=_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, (1 << 31) - 1, size=_NUM_PERM, dtype=np.uint64)
+
+
+def minhash_signature(text):
+    """Return a MinHash signature of the word 5-shingles of `text`."""
+    words = text.lower().split()
+    if len(words) < _SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + _SHINGLE_SIZE]) for i in range(len(words) - _SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return ((_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+
+def _location(meta):
+    """Return a (label, value) pair describing where a chunk comes from."""
+    for key, label in (("page_num", "page"), ("slide_num", "slide"), ("chunk_num", "part")):
+        if key in meta:
+            return label, meta[key]
+    return "page", "Unknown Page"
+
+
+def _merge_text(left, right):
+    """Join two chunks, dropping the words `right` repeats from the end of `left`."""
+    left_words = left.split()
+    right_words = right.split()
+    for size in range(min(len(left_words), len(right_words)), 0, -1):
+        if left_words[-size:] == right_words[:size]:
+            return " ".join(left_words + right_words[size:])
+    return f"{left}\n{right}"
+
+
+def _truncate(text, max_tokens):
+    words = []
+    tokens = 0
+    for word in text.split():
+        word_tokens = count_tokens(word)
+        if tokens + word_tokens > max_tokens:
+            break
+        words.append(word)
+        tokens += word_tokens
+    return " ".join(words)
+
+
+def pack_context(hits, token_budget=DEFAULT_CONTEXT_TOKEN_BUDGET, dedup_threshold=DEFAULT_DEDUP_THRESHOLD):
+    """
+    Assemble retrieved chunks into a prompt context.
+
+    Near-duplicate chunks (estimated Jaccard similarity of their shingles
+    above `dedup_threshold`) are dropped, chunks from the same file and page
+    are merged into one section, and sections are added in relevance order
+    until `token_budget` is reached.
+
+    Args:
+        hits (list[dict]): Retrieval hits with "id", "document" and "metadata", best first.
+        token_budget (int): Maximum number of tokens in the packed text.
+        dedup_threshold (float): Similarity above which a chunk counts as a duplicate.
+
+    Returns:
+        dict: {"text": str, "references": list[dict]} where each reference has
+        "file_name", "location", "chunk_ids" and "tokens".
+    """
+    # Drop near-duplicates, keeping the most relevant copy
+    kept = []
+    signatures = []
+    for hit in hits:
+        if not hit.get("document"):
+            continue
+        signature = minhash_signature(hit["document"])
+        if any(np.mean(signature == other) >= dedup_threshold for other in signatures):
+            continue
+        kept.append(hit)
+        signatures.append(signature)
+
+    # Merge chunks from the same file and page, ordered by their best hit
+    sections = {}
+    for hit in kept:
+        meta = hit.get("metadata") or {}
+        file_name = meta.get("file_name", "Unknown File")
+        label, value = _location(meta)
+        key = (file_name, label, value)
+        if key in sections:
+            section = sections[key]
+            section["text"] = _merge_text(section["text"], hit["document"])
+            section["chunk_ids"].append(hit["id"])
+        else:
+            sections[key] = {"file_name": file_name, "location": f"{label}: {value}", "text": hit["document"], "chunk_ids": [hit["id"]]}
+
+    # Pack sections into the token budget, most relevant first
+    parts = []
+    references = []
+    used = 0
+    for section in sections.values():
+        header = f"Reference: file name: {section['file_name']}, {section['location']}"
+        block = f"{header}\n{section['text']}"
+        tokens = count_tokens(block)
+        if used + tokens > token_budget:
+            if parts:
+                continue  # A smaller section further down may still fit
+            # Even the most relevant section is too large: keep its beginning
+            block = f"{header}\n{_truncate(section['text'], token_budget - count_tokens(header))}"
+            tokens = count_tokens(block)
+        parts.append(block)
+        references.append({
+            "file_name": section["file_name"],
+            "location": section["location"],
+            "chunk_ids": section["chunk_ids"],
+            "tokens": tokens,
+        })
+        used += tokens
+
+    return {"text": "\n\n".join(parts), "references": references}
@@ -0,0 +1,227 @@
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    file_name TEXT PRIMARY KEY,
+    type TEXT,
+    file_hash TEXT,
+    chunk_count INTEGER NOT NULL DEFAULT 0,
+    total_chars INTEGER NOT NULL DEFAULT 0,
+    ingested_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    chunk_id TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL REFERENCES documents(file_name) ON DELETE CASCADE,
+    size INTEGER NOT NULL,
+    position INTEGER,
+    ingested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_by_file ON chunks(file_name);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Metadata key giving the page or slide number, for the content types that
+# have one. Parts of a transcript or an OCRed image are not positions.
+POSITION_KEYS = {"pdf": "page_num", "pptx": "slide_num"}
+
+
+def chunk_position(metadata):
+    """Return the page or slide number of a chunk, or None."""
+    key = POSITION_KEYS.get(metadata.get("type"))
+    value = metadata.get(key) if key else None
+    return value if isinstance(value, int) else None
+
+
+class DocumentCatalog:
+    """
+    Per-file index of the chunks stored in the vector collection, kept in SQLite.
+
+    Holds each document's type, file hash, chunk count, total size and ingest
+    time, and the ID, size and page/slide of every chunk, so listing, filtering
+    and deleting documents never scans the collection. Every method runs in a
+    single transaction.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _refresh_counts(self, file_names):
+        self._conn.executemany(
+            """
+            UPDATE documents SET
+                chunk_count = (SELECT COUNT(*) FROM chunks WHERE chunks.file_name = documents.file_name),
+                total_chars = (SELECT COALESCE(SUM(size), 0) FROM chunks WHERE chunks.file_name = documents.file_name),
+                updated_at = ?
+            WHERE file_name = ?
+            """,
+            [(time.time(), file_name) for file_name in file_names],
+        )
+
+    def add_chunks(self, chunks):
+        """
+        Record written chunks.
+
+        Args:
+            chunks (Iterable[dict]): Dictionaries containing "content" and "metadata"
+                with at least "unique_id" and "file_name".
+        """
+        now = time.time()
+        documents = {}
+        rows = []
+        for chunk in chunks:
+            meta = chunk["metadata"]
+            file_name = meta.get("file_name", "Unknown File")
+            documents.setdefault(file_name, meta.get("type"))
+            rows.append((
+                meta["unique_id"], file_name, len(chunk["content"]), chunk_position(meta), meta.get("ingested_at", now)
+            ))
+        if not rows:
+            return
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO documents (file_name, type, ingested_at, updated_at) VALUES (?, ?, ?, ?)",
+                [(file_name, doc_type, now, now) for file_name, doc_type in documents.items()],
+            )
+            self._conn.executemany(
+                """
+                INSERT INTO chunks (chunk_id, file_name, size, position, ingested_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(chunk_id) DO UPDATE SET
+                    file_name = excluded.file_name, size = excluded.size, position = excluded.position
+                """,
+                rows,
+            )
+            self._refresh_counts(documents)
+
+    def remove_chunks(self, chunk_ids):
+        """Forget the given chunks; documents left without chunks are dropped."""
+        chunk_ids = list(chunk_ids)
+        if not chunk_ids:
+            return
+        with self._lock, self._conn:
+            file_names = set()
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                file_names.update(row[0] for row in self._conn.execute(
+                    f"SELECT DISTINCT file_name FROM chunks WHERE chunk_id IN ({placeholders})", batch
+                ))
+                self._conn.execute(f"DELETE FROM chunks WHERE chunk_id IN ({placeholders})", batch)
+            self._refresh_counts(file_names)
+            self._conn.execute("DELETE FROM documents WHERE chunk_count = 0")
+
+    def ingest_times(self, chunk_ids):
+        """Return a dict of chunk ID -> ingest time for the given chunks."""
+        chunk_ids = list(chunk_ids)
+        times = {}
+        with self._lock:
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                times.update(self._conn.execute(
+                    f"SELECT chunk_id, ingested_at FROM chunks WHERE chunk_id IN ({placeholders})", batch
+                ).fetchall())
+        return times
+
+    def get_setting(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_setting(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+    def set_file_hash(self, file_name, file_hash):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE documents SET file_hash = ? WHERE file_name = ?", (file_hash, file_name))
+
+    def get_document(self, file_name):
+        """Return the catalog row of `file_name` as a dict, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM documents WHERE file_name = ?", (file_name,)).fetchone()
+        return dict(row) if row else None
+
+    def chunk_ids(self, file_name):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT chunk_id FROM chunks WHERE file_name = ?", (file_name,))]
+
+    def filter_chunk_ids(self, file_names=None, types=None, position_range=None, ingested_after=None, ingested_before=None):
+        """
+        Return the IDs of the chunks matching all given filters.
+
+        Args:
+            file_names (Iterable[str]): Only chunks of these documents.
+            types (Iterable[str]): Only documents of these content types ("pdf", "pptx", "youtube", "image").
+            position_range (tuple[int, int]): Inclusive page/slide range; only
+                PDF and PowerPoint chunks match.
+            ingested_after (float): Only chunks written at or after this Unix time.
+            ingested_before (float): Only chunks written before this Unix time.
+        """
+        clauses = []
+        params = []
+        if file_names:
+            file_names = list(file_names)
+            clauses.append(f"chunks.file_name IN ({','.join('?' * len(file_names))})")
+            params.extend(file_names)
+        if types:
+            types = list(types)
+            clauses.append(f"documents.type IN ({','.join('?' * len(types))})")
+            params.extend(types)
+        if position_range:
+            # Rows written before positions were limited to pages and slides
+            # may still hold transcript part numbers
+            clauses.append(f"documents.type IN ({','.join('?' * len(POSITION_KEYS))}) AND chunks.position BETWEEN ? AND ?")
+            params.extend(POSITION_KEYS)
+            params.extend(position_range)
+        if ingested_after is not None:
+            clauses.append("chunks.ingested_at >= ?")
+            params.append(ingested_after)
+        if ingested_before is not None:
+            clauses.append("chunks.ingested_at < ?")
+            params.append(ingested_before)
+
+        query = "SELECT chunk_id FROM chunks JOIN documents USING (file_name)"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def remove_document(self, file_name):
+        """Drop a document and its chunks, returning the removed chunk IDs."""
+        with self._lock, self._conn:
+            ids = [row[0] for row in self._conn.execute("SELECT chunk_id FROM chunks WHERE file_name = ?", (file_name,))]
+            self._conn.execute("DELETE FROM documents WHERE file_name = ?", (file_name,))
+        return ids
+
+    def list_documents(self, name_filter=None):
+        """
+        List documents ordered by name, optionally only those whose name
+        contains `name_filter` (case-insensitive).
+        """
+        query = "SELECT file_name, type, chunk_count, total_chars, ingested_at, updated_at FROM documents"
+        params = ()
+        if name_filter:
+            escaped = name_filter.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            query += " WHERE file_name LIKE ? ESCAPE '\\'"
+            params = (f"%{escaped}%",)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query + " ORDER BY file_name", params)]
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM documents LIMIT 1").fetchone() is None
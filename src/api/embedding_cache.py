@@ -0,0 +1,209 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+_KEY_BYTES = 32  # SHA-256 digest
+
+
+def _row_bytes(dim):
+    """Disk bytes per cached vector: the float32 vector, its key and its last-use time."""
+    return dim * 4 + _KEY_BYTES + 8
+
+
+class _VectorStore:
+    """
+    Fixed-capacity store of float32 vectors of one dimension.
+
+    Vectors live in one preallocated, memory-mapped array file; a parallel
+    key array and last-use array make the store self-describing, so the
+    index is rebuilt at startup from three file reads instead of one file
+    per entry.
+    """
+
+    def __init__(self, cache_dir, dim, capacity=None):
+        prefix = os.path.join(cache_dir, f"{dim}d")
+        self.paths = [f"{prefix}.vectors", f"{prefix}.keys", f"{prefix}.used"]
+        exists = os.path.exists(f"{prefix}.vectors")
+        if exists:
+            # An existing store keeps the capacity it was created with
+            capacity = os.path.getsize(f"{prefix}.vectors") // (dim * 4)
+        self.dim = dim
+        self.capacity = capacity
+        mode = "r+" if exists else "w+"
+        self.vectors = np.memmap(f"{prefix}.vectors", dtype=np.float32, mode=mode, shape=(capacity, dim))
+        self.keys = np.memmap(f"{prefix}.keys", dtype=np.uint8, mode=mode, shape=(capacity, _KEY_BYTES))
+        self.last_used = np.memmap(f"{prefix}.used", dtype=np.float64, mode=mode, shape=(capacity,))
+
+        # Rebuild key -> row in least-recently-used order
+        self.rows = OrderedDict()
+        occupied = np.flatnonzero(self.keys.any(axis=1))
+        for row in occupied[np.argsort(self.last_used[occupied], kind="stable")]:
+            self.rows[self.keys[row].tobytes()] = int(row)
+        self.free_rows = sorted(set(range(capacity)).difference(self.rows.values()), reverse=True)
+
+    @property
+    def nbytes(self):
+        return self.capacity * _row_bytes(self.dim)
+
+    def last_use(self):
+        return float(self.last_used.max()) if self.capacity else 0.0
+
+    def delete(self):
+        """Drop the store's files; the store must not be used afterwards."""
+        del self.vectors, self.keys, self.last_used
+        for path in self.paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed cache of embedding vectors.
+
+    Keys are a hash of the model name and the normalized text. Vectors of
+    each dimension are kept in one preallocated float32 memmap with a
+    key -> row index; when the array is full the least-recently-used row is
+    overwritten.
+
+    `max_bytes` caps all stores together. A store for a new dimension (after
+    switching embedding models) gets the unused budget; if that is less than
+    half of `max_bytes`, stores of other dimensions are dropped, least
+    recently used first, to make room.
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._stores = {}  # dimension -> _VectorStore
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Reopen existing stores, most recently used first, while they fit the budget
+        existing = [
+            _VectorStore(cache_dir, int(name[:-len("d.vectors")]))
+            for name in os.listdir(cache_dir) if name.endswith("d.vectors")
+        ]
+        budget = max_bytes
+        for store in sorted(existing, key=lambda store: store.last_use(), reverse=True):
+            if store.nbytes <= budget:
+                self._stores[store.dim] = store
+                budget -= store.nbytes
+            else:
+                store.delete()
+
+    @staticmethod
+    def make_key(model_name, text):
+        """Hash the model name and whitespace-normalized text into a cache key."""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(f"{model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def _store(self, dim):
+        store = self._stores.get(dim)
+        if store is None:
+            free = self.max_bytes - sum(other.nbytes for other in self._stores.values())
+            for other in sorted(self._stores.values(), key=lambda other: other.last_use()):
+                if free >= self.max_bytes // 2:
+                    break
+                del self._stores[other.dim]
+                other.delete()
+                free += other.nbytes
+            capacity = max(1, free // _row_bytes(dim))
+            store = self._stores[dim] = _VectorStore(self.cache_dir, dim, capacity)
+        return store
+
+    def get(self, key):
+        """Return a copy of the cached vector for `key`, or None on a miss."""
+        digest = bytes.fromhex(key)
+        with self._lock:
+            for store in self._stores.values():
+                row = store.rows.get(digest)
+                if row is not None:
+                    store.rows.move_to_end(digest)
+                    store.last_used[row] = time.time()  # Keep the LRU order across restarts
+                    self.hits += 1
+                    return np.array(store.vectors[row])
+            self.misses += 1
+            return None
+
+    def put(self, key, vector):
+        """Store a vector under `key`, overwriting the least recently used row if full."""
+        vector = np.asarray(vector, dtype=np.float32)
+        digest = bytes.fromhex(key)
+        with self._lock:
+            store = self._store(vector.shape[0])
+            row = store.rows.get(digest)
+            if row is None:
+                if store.free_rows:
+                    row = store.free_rows.pop()
+                else:
+                    _, row = store.rows.popitem(last=False)
+                store.rows[digest] = row
+            store.rows.move_to_end(digest)
+            # Vector first, key last, so a crash never leaves a key pointing at a partial vector
+            store.keys[row] = 0
+            store.vectors[row] = vector
+            store.last_used[row] = time.time()
+            store.keys[row] = np.frombuffer(digest, dtype=np.uint8)
+
+    def flush(self):
+        """Write pending changes of the memory-mapped files to disk."""
+        with self._lock:
+            for store in self._stores.values():
+                store.vectors.flush()
+                store.keys.flush()
+                store.last_used.flush()
+
+    def stats(self):
+        """Return hit/miss counters and the current cache size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            entries = sum(len(store.rows) for store in self._stores.values())
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "bytes": sum(len(store.rows) * store.dim * 4 for store in self._stores.values()),
+            }
+
+
+class CachedEmbeddings:
+    """
+    Wrap an embedding model exposing `embed_documents` / `embed_query`
+    so that repeated texts are served from an EmbeddingCache.
+    """
+
+    def __init__(self, model, cache, model_name):
+        self.model = model
+        self.cache = cache
+        self.model_name = model_name
+
+    def embed_documents(self, texts):
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+
+        # Only send the misses to the underlying model, in one request
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            fresh = self.model.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, fresh):
+                self.cache.put(keys[i], vector)
+                vectors[i] = vector
+
+        return [np.asarray(vector, dtype=np.float32).tolist() for vector in vectors]
+
+    def embed_query(self, text):
+        key = EmbeddingCache.make_key(self.model_name, text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.model.embed_query(text)
+            self.cache.put(key, vector)
+        return np.asarray(vector, dtype=np.float32).tolist()
@@ -0,0 +1,126 @@
+import os
+import re
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+OPENAI_DEFAULT_MODEL = "text-embedding-ada-002"
+SENTENCE_TRANSFORMERS_DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+
+class EmbeddingBackend(ABC):
+    """
+    Common interface for embedding backends.
+
+    Subclasses set `name` and `model_name` and implement `embed_documents`.
+    """
+
+    name = "base"
+    model_name = ""
+
+    @abstractmethod
+    def embed_documents(self, texts):
+        """Return one embedding vector per text."""
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """Remote embeddings through the OpenAI API."""
+
+    name = "openai"
+
+    def __init__(self, model_name=None):
+        from langchain_openai import OpenAIEmbeddings
+
+        self.model_name = model_name or OPENAI_DEFAULT_MODEL
+        self._client = OpenAIEmbeddings(model=self.model_name)
+
+    def embed_documents(self, texts):
+        return self._client.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self._client.embed_query(text)
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """
+    Local CPU embeddings with sentence-transformers.
+
+    Works offline once the model is in the local Hugging Face cache, or when
+    `model_name` points to a model directory on disk.
+    """
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name=None, batch_size=64, device="cpu"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name or SENTENCE_TRANSFORMERS_DEFAULT_MODEL
+        self.batch_size = batch_size
+        self._model = SentenceTransformer(self.model_name, device=device)
+
+    def embed_documents(self, texts):
+        if not texts:
+            return []
+        vectors = self._model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).astype(np.float32, copy=False)
+
+        # L2-normalize in place so cosine and inner-product search agree
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.maximum(norms, 1e-12, out=norms)
+        vectors /= norms
+        return vectors.tolist()
+
+
+EMBEDDING_BACKENDS = {
+    OpenAIEmbeddingBackend.name: OpenAIEmbeddingBackend,
+    SentenceTransformerBackend.name: SentenceTransformerBackend,
+}
+
+
+_DEFAULT_MODELS = {
+    OpenAIEmbeddingBackend.name: OPENAI_DEFAULT_MODEL,
+    SentenceTransformerBackend.name: SENTENCE_TRANSFORMERS_DEFAULT_MODEL,
+}
+
+
+def resolve_embedding_config(name=None, model_name=None):
+    """
+    Resolve the (backend name, model name) pair from arguments or the
+    EMBEDDING_BACKEND / EMBEDDING_MODEL environment variables, without
+    loading anything.
+    """
+    name = name or os.getenv("EMBEDDING_BACKEND", OpenAIEmbeddingBackend.name)
+    if name not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{name}'. Choose one of: {', '.join(EMBEDDING_BACKENDS)}")
+    model_name = model_name or os.getenv("EMBEDDING_MODEL") or _DEFAULT_MODELS[name]
+    return name, model_name
+
+
+def create_embedding_backend(name=None, model_name=None):
+    """
+    Create the embedding backend selected by name or by the
+    EMBEDDING_BACKEND / EMBEDDING_MODEL environment variables.
+    """
+    name, model_name = resolve_embedding_config(name, model_name)
+    return EMBEDDING_BACKENDS[name](model_name=model_name)
+
+
+def collection_name_for(base_name, backend_name, model_name):
+    """
+    Return the collection name for vectors produced by a backend/model pair.
+
+    Each pair gets its own collection so vectors from different embedding
+    spaces never mix. The original OpenAI setup keeps `base_name`.
+    """
+    if backend_name == OpenAIEmbeddingBackend.name and model_name == OPENAI_DEFAULT_MODEL:
+        return base_name
+    slug = re.sub(r"[^a-zA-Z0-9]+", "-", f"{backend_name}-{os.path.basename(model_name)}").strip("-").lower()
+    return f"{base_name}_{slug}"[:63].rstrip("-_")
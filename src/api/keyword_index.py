@@ -0,0 +1,219 @@
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+
+import numpy as np
+
+# Keeps compound terms such as policy numbers ("ab-1234"), versions ("v2.1")
+# and formulas ("e=mc2") together, and also indexes their parts.
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_./=+][a-z0-9]+)*")
+_PART_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase `text` and split it into keyword terms."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        parts = _PART_RE.findall(token)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """
+    Array-backed inverted index with BM25 scoring.
+
+    Documents are numbered internally; each term maps to two compact
+    `array('I')` postings lists (document numbers and term frequencies),
+    and scoring is vectorized with NumPy. Removed documents are tombstoned
+    and physically dropped by `compact()` once they make up a large share
+    of the index.
+    """
+
+    def __init__(self, path=None, k1=1.5, b=0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._doc_ids = []  # doc number -> chunk ID
+        self._doc_numbers = {}  # chunk ID -> doc number
+        self._doc_lengths = array("I")
+        self._alive = bytearray()
+        self._postings = {}  # term -> (array of doc numbers, array of term frequencies)
+        self._total_length = 0
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._doc_numbers)
+
+    def add(self, ids, documents):
+        """Index documents, replacing any existing entries with the same IDs."""
+        with self._lock:
+            self._remove(ids)
+            for doc_id, text in zip(ids, documents):
+                terms = tokenize(text or "")
+                doc_number = len(self._doc_ids)
+                self._doc_ids.append(doc_id)
+                self._doc_numbers[doc_id] = doc_number
+                self._doc_lengths.append(len(terms))
+                self._alive.append(1)
+                self._total_length += len(terms)
+
+                counts = {}
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+                for term, tf in counts.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = (array("I"), array("I"))
+                    postings[0].append(doc_number)
+                    postings[1].append(tf)
+
+    def remove(self, ids):
+        """Remove documents by ID. Unknown IDs are ignored."""
+        with self._lock:
+            self._remove(ids)
+            if self._dead > 1000 and self._dead > len(self._doc_ids) // 4:
+                self.compact()
+
+    def _remove(self, ids):
+        for doc_id in ids:
+            doc_number = self._doc_numbers.pop(doc_id, None)
+            if doc_number is None:
+                continue
+            self._alive[doc_number] = 0
+            self._total_length -= self._doc_lengths[doc_number]
+            self._dead += 1
+
+    def compact(self):
+        """Rebuild the postings without tombstoned documents."""
+        with self._lock:
+            alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+            remap = np.cumsum(alive, dtype=np.int64) - 1
+            postings = {}
+            for term, (docs, tfs) in self._postings.items():
+                docs_np = np.frombuffer(docs, dtype=np.uint32)
+                keep = alive[docs_np]
+                if keep.any():
+                    postings[term] = (
+                        array("I", remap[docs_np[keep]].astype(np.uint32).tobytes()),
+                        array("I", np.frombuffer(tfs, dtype=np.uint32)[keep].tobytes()),
+                    )
+            lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32)[alive]
+            self._doc_ids = [doc_id for doc_id, keep in zip(self._doc_ids, alive) if keep]
+            self._doc_numbers = {doc_id: n for n, doc_id in enumerate(self._doc_ids)}
+            self._doc_lengths = array("I", lengths.tobytes())
+            self._alive = bytearray(b"\x01" * len(self._doc_ids))
+            self._postings = postings
+            self._dead = 0
+
+    def search(self, query, top_k=10, allowed_ids=None):
+        """
+        Return up to `top_k` (chunk ID, score) pairs ranked by BM25.
+
+        Args:
+            query (str): Free-text query.
+            top_k (int): Maximum number of results.
+            allowed_ids (Iterable[str]): Optional set of IDs to restrict the search to.
+        """
+        with self._lock:
+            n_alive = len(self._doc_numbers)
+            if not n_alive:
+                return []
+            alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+            if allowed_ids is not None:
+                allowed = np.zeros(len(self._doc_ids), dtype=bool)
+                numbers = [self._doc_numbers[i] for i in allowed_ids if i in self._doc_numbers]
+                allowed[numbers] = True
+                alive &= allowed
+
+            lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32).astype(np.float32)
+            avg_length = self._total_length / n_alive or 1.0
+            scores = np.zeros(len(self._doc_ids), dtype=np.float32)
+
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                docs = np.frombuffer(postings[0], dtype=np.uint32)
+                docs_alive = alive[docs]
+                docs = docs[docs_alive]
+                if not len(docs):
+                    continue
+                tf = np.frombuffer(postings[1], dtype=np.uint32)[docs_alive].astype(np.float32)
+                df = len(docs)
+                idf = math.log(1.0 + (n_alive - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1.0 - self.b + self.b * lengths[docs] / avg_length)
+                scores[docs] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+            candidates = np.flatnonzero(scores)
+            if not len(candidates):
+                return []
+            if len(candidates) > top_k:
+                candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+            candidates = candidates[np.argsort(-scores[candidates])]
+            return [(self._doc_ids[n], float(scores[n])) for n in candidates]
+
+    def save(self):
+        """Persist the index to `path`, compacting tombstones first."""
+        if not self.path:
+            return
+        with self._lock:
+            if self._dead:
+                self.compact()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    {
+                        "doc_ids": self._doc_ids,
+                        "doc_lengths": self._doc_lengths,
+                        "postings": self._postings,
+                        "total_length": self._total_length,
+                    },
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_path, self.path)
+
+    def load(self):
+        """Load the index from `path`. Returns False if there is nothing to load."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        with open(self.path, "rb") as f:
+            state = pickle.load(f)
+        with self._lock:
+            self._reset()
+            self._doc_ids = state["doc_ids"]
+            self._doc_numbers = {doc_id: n for n, doc_id in enumerate(self._doc_ids)}
+            self._doc_lengths = state["doc_lengths"]
+            self._alive = bytearray(b"\x01" * len(self._doc_ids))
+            self._postings = state["postings"]
+            self._total_length = state["total_length"]
+        return True
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Fuse several ranked lists of IDs with reciprocal-rank fusion.
+
+    Args:
+        rankings (list[list[str]]): Ranked ID lists, best first.
+        k (int): RRF damping constant.
+
+    Returns:
+        list[str]: IDs ordered by fused score.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
@@ -0,0 +1,62 @@
+import contextvars
+import queue
+import threading
+
+# Queue receiving stream events for the LLM run active in the current context
+_stream_sink = contextvars.ContextVar("stream_sink", default=None)
+_DONE = object()
+
+
+def _subscribe_to_llm_stream_events():
+    """Forward the token chunks crewai emits for LLMs created with `stream=True`."""
+    try:
+        from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+    except ImportError:
+        from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+
+    # Chunk handlers run synchronously in the thread making the LLM call,
+    # so the sink of that run is visible here
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def on_stream_chunk(source, event):
+        sink = _stream_sink.get()
+        if sink is not None and event.chunk and getattr(event, "tool_call", None) is None:
+            sink.put(("token", event.chunk))
+
+
+_subscribe_to_llm_stream_events()
+
+
+def stream_llm_run(run):
+    """
+    Call `run(events)` on a background thread and yield the tokens it streams.
+
+    `run` receives the event queue, to which it may put its own events, and
+    its return value is yielded last. Runs outside a streaming context are
+    not affected.
+
+    Yields:
+        tuple: ("token", str) for each generated token, any events put by
+        `run`, and finally ("result", value).
+    """
+    events = queue.Queue()
+
+    def target():
+        _stream_sink.set(events)
+        try:
+            events.put(("result", run(events)))
+        except Exception as e:
+            events.put(("error", e))
+        finally:
+            events.put(_DONE)
+
+    # Run in a copy of the current context so the sink stays local to this run
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(target,), name="llm-stream", daemon=True).start()
+
+    while True:
+        event = events.get()
+        if event is _DONE:
+            return
+        if event[0] == "error":
+            raise event[1]
+        yield event
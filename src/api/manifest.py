@@ -0,0 +1,37 @@
+import hashlib
+
+
+def content_hash(data):
+    """Return the SHA-256 hex digest of a string or bytes."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_chunk_id(file_name, content, location="", occurrence=0):
+    """
+    Build a stable, content-derived chunk ID.
+
+    The ID only changes when the chunk text or its location (page, slide...)
+    changes, so re-ingesting an unchanged chunk yields the same ID.
+    `occurrence` disambiguates identical chunks at the same location.
+    """
+    digest = content_hash(f"{location}\0{occurrence}\0{content}")[:16]
+    return f"{file_name}_{digest}"
+
+
+class ChunkIdAllocator:
+    """
+    Assign stable chunk IDs for one document, numbering repeated identical
+    chunks at the same location so their IDs stay distinct.
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self._seen = {}
+
+    def __call__(self, content, location=""):
+        key = (location, content_hash(content))
+        occurrence = self._seen.get(key, 0)
+        self._seen[key] = occurrence + 1
+        return make_chunk_id(self.file_name, content, location=location, occurrence=occurrence)
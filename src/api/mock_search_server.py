@@ -0,0 +1,91 @@
+"""
+Local stand-in for the Google Custom Search JSON API.
+
+Serves deterministic fake results for any query, so web search can be
+load-tested offline:
+
+    python -m src.api.mock_search_server --port 8765 --latency 0.2
+    WEB_SEARCH_URL=http://127.0.0.1:8765/customsearch/v1 streamlit run streamlit_app.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_results(query, num_results):
+    """Build Custom Search style items that only depend on the query."""
+    slug = "-".join(query.lower().split()) or "empty"
+    items = []
+    for rank in range(1, num_results + 1):
+        digest = hashlib.sha1(f"{query}\0{rank}".encode("utf-8")).hexdigest()[:8]
+        items.append({
+            "title": f"{query} - result {rank}",
+            "snippet": f"Mock search result {rank} for '{query}' ({digest}).",
+            "link": f"https://example.com/{slug}/{rank}",
+        })
+    return items
+
+
+class MockSearchHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+    requests_served = 0
+    _counter_lock = threading.Lock()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        query = params.get("q", [""])[0]
+        num_results = min(int(params.get("num", ["5"])[0]), 10)
+
+        with self._counter_lock:
+            MockSearchHandler.requests_served += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if random.random() < self.error_rate:
+            status, body = 503, {"error": {"code": 503, "message": "Backend unavailable (injected)."}}
+        elif not query:
+            status, body = 400, {"error": {"code": 400, "message": "Missing query parameter 'q'."}}
+        else:
+            status, body = 200, {"items": fake_results(query, num_results)}
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # Keep load tests quiet
+
+
+def serve(host="127.0.0.1", port=8765, latency=0.0, error_rate=0.0):
+    MockSearchHandler.latency = latency
+    MockSearchHandler.error_rate = error_rate
+    server = ThreadingHTTPServer((host, port), MockSearchHandler)
+    print(f"Mock search server listening on http://{host}:{port}/customsearch/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {MockSearchHandler.requests_served} requests")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve fake Google Custom Search results.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.latency, args.error_rate)
@@ -1,7 +1,6 @@
-from langchain_community.chat_models import ChatOpenAI
 import os
+from crewai import LLM
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
 
 
 load_dotenv()
@@ -9,18 +8,23 @@ load_dotenv()
 groq_api_key = os.getenv("GROQ_API_KEY")
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
+# Clients are created with stream=True so crewai emits an LLMStreamChunkEvent
+# per token, which src.api.llm_stream forwards to the chat
+
 # Initialize Groq
 def initialize_groq_llm():
-    return ChatGroq(
-        temperature=0,
-        groq_api_key=groq_api_key,
+    return LLM(
         model="groq/llama3-8b-8192",
+        temperature=0,
+        api_key=groq_api_key,
+        stream=True,
     )
 
 # Initialize OpenAI
 def initialize_openai_llm():
-    return ChatOpenAI(
+    return LLM(
+        model="gpt-4o",
         temperature=0,
-        openai_api_key=openai_api_key,
-        model="gpt-4o"
-    )
\ No newline at end of file
+        api_key=openai_api_key,
+        stream=True,
+    )
@@ -1,3 +1,4 @@
 from .real_time_stt import RealTimeSTT
+from .stt_service import STTService
 
-__all__ = ["RealTimeSTT"]
+__all__ = ["RealTimeSTT", "STTService"]
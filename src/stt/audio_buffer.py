@@ -0,0 +1,65 @@
+import threading
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity float32 audio buffer addressed by absolute sample index.
+
+    Storage is allocated once, on the first write, so an idle buffer costs
+    nothing; `write` copies incoming blocks straight into it, so recording
+    cost per block is constant and long recordings cause no allocations.
+    Once full, the oldest samples are overwritten.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = None  # Allocated on first write
+        self._lock = threading.Lock()
+        self.total_written = 0  # Absolute index of the next sample to be written
+
+    def __len__(self):
+        return min(self.total_written, self.capacity)
+
+    @property
+    def oldest(self):
+        """Absolute index of the oldest sample still held."""
+        return max(0, self.total_written - self.capacity)
+
+    def clear(self):
+        with self._lock:
+            self.total_written = 0
+
+    def write(self, samples):
+        """Append a block of samples, overwriting the oldest ones when full."""
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            skipped, n = n - self.capacity, self.capacity
+        else:
+            skipped = 0
+        with self._lock:
+            if self._data is None:
+                self._data = np.empty(self.capacity, dtype=np.float32)
+            start = (self.total_written + skipped) % self.capacity
+            first = min(n, self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            if first < n:
+                self._data[:n - first] = samples[first:]
+            self.total_written += skipped + n
+
+    def read(self, start=0, end=None):
+        """
+        Return a copy of the samples in [start, end), clamped to what is still held.
+        """
+        with self._lock:
+            end = self.total_written if end is None else min(end, self.total_written)
+            start = max(start, self.oldest)
+            if start >= end:
+                return np.array([], dtype=np.float32)
+            first = start % self.capacity
+            last = first + (end - start)
+            if last <= self.capacity:
+                return self._data[first:last].copy()
+            return np.concatenate((self._data[first:], self._data[:last - self.capacity]))
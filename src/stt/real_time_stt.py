@@ -1,20 +1,36 @@
-import whisper
+import queue
+import threading
+import time
 import sounddevice as sd
 import numpy as np
 import soundfile as sf
+from src.stt.audio_buffer import RingBuffer
+from src.stt.stt_service import STTService
+from src.stt.vad import VoiceActivityDetector
+
+
+def _peak_normalize(audio_data):
+    """Scale audio in place so its peak is at full scale."""
+    peak = np.max(np.abs(audio_data)) if len(audio_data) else 0.0
+    if peak > 0:
+        audio_data /= peak
+    return audio_data
 
 
 class RealTimeSTT:
-    def __init__(self, model_name="base", silence_threshold=0.27, silence_duration=3):
+    def __init__(self, model_name="base", silence_duration=3, vad_aggressiveness=2, max_record_seconds=300, stt_service=None):
         """
         Initialize RealTimeSTT with Whisper model and silence detection parameters.
+
+        Pass a shared `stt_service` to reuse one loaded model across instances.
         """
-        self.model = whisper.load_model(model_name)  # Load Whisper model
+        self.stt_service = stt_service or STTService(model_name)  # Load Whisper model
         self.sample_rate = 16000  # Required sample rate for Whisper
-        self.silence_threshold = silence_threshold
         self.silence_duration = silence_duration
         self.chunk_size = int(self.sample_rate * 0.1)  # Process chunks of 0.1 seconds
-        self.audio_buffer = []  # Audio buffer to store recorded chunks
+        # Recording buffer, allocated when recording starts; the oldest audio is overwritten past max_record_seconds
+        self.audio_buffer = RingBuffer(int(self.sample_rate * max_record_seconds))
+        self.vad = VoiceActivityDetector(self.sample_rate, aggressiveness=vad_aggressiveness)
         self.running = True  # Control flag for stopping the recording
 
     def list_devices(self):
@@ -25,8 +41,10 @@ class RealTimeSTT:
         """Record audio until silence is detected and save debug audio."""
         print("Recording audio with silence detection...")
 
-        self.audio_buffer = []  # Clear the buffer before recording
+        self.audio_buffer.clear()  # Clear the buffer before recording
+        self.vad.reset()
         silence_counter = 0  # Counter for silent chunks
+        silence_chunks = int(self.silence_duration * self.sample_rate / self.chunk_size)
 
         def callback(indata, frames, time, status):
             """Callback function to process incoming audio in real time."""
@@ -35,25 +53,16 @@ class RealTimeSTT:
             if status:
                 print(f"Status: {status}")
             audio_chunk = indata[:, 0]  # Get the first channel of audio
-
-            # Normalize the audio chunk to handle low amplitude signals
-            if np.max(np.abs(audio_chunk)) > 0:
-                audio_chunk = audio_chunk / np.max(np.abs(audio_chunk))
-
-            self.audio_buffer.append(audio_chunk)
-
-            # Calculate the chunk's amplitude
-            chunk_amplitude = np.abs(audio_chunk).mean()
-            print(f"Chunk Amplitude: {chunk_amplitude:.5f}")
+            self.audio_buffer.write(audio_chunk)
 
             # Check for silence
-            if chunk_amplitude < self.silence_threshold:
-                silence_counter += 1
-            else:
+            if self.vad.is_speech(audio_chunk):
                 silence_counter = 0
+            else:
+                silence_counter += 1
 
             # Stop recording if silence persists
-            if silence_counter > self.silence_duration / 0.1:  # Silence duration in chunks
+            if silence_counter > silence_chunks:
                 print("Silence detected, stopping recording.")
                 self.running = False
                 raise sd.CallbackStop()
@@ -65,7 +74,7 @@ class RealTimeSTT:
                 dtype=np.float32,
                 blocksize=self.chunk_size,
                 callback=callback,
-                device=0,  # Allow device selection
+                device=0 if device_index is None else device_index,  # Allow device selection
             ):
                 while self.running:
                     sd.sleep(100)  # Allow stream to process audio
@@ -74,8 +83,7 @@ class RealTimeSTT:
         except Exception as e:
             print(f"Error during recording: {e}")
 
-        # Combine the audio buffer into a single array
-        audio_data = np.concatenate(self.audio_buffer) if self.audio_buffer else np.array([])
+        audio_data = _peak_normalize(self.audio_buffer.read())
         print(f"Recording complete. Captured {len(audio_data)} samples.")
 
         # Save debug audio
@@ -97,14 +105,117 @@ class RealTimeSTT:
         """Transcribe audio using Whisper."""
         print("Transcribing audio...")
         try:
-            result = self.model.transcribe(audio_data, fp16=False)
+            result = self.stt_service.transcribe(audio_data)
             return result["text"]
         except Exception as e:
             print(f"Error during transcription: {e}")
             return ""
 
-    def listen_and_transcribe(self, device_index=None, debug_audio_filename="debug_audio.wav"):
-        """Record and transcribe audio until silence is detected, saving debug audio."""
+    def _buffered_audio(self, start_sample):
+        """Return the recorded audio from `start_sample` on, normalized for Whisper."""
+        return _peak_normalize(self.audio_buffer.read(start_sample))
+
+    def _transcribe_segments(self, audio_data, prompt=""):
+        """Transcribe a window of audio and return Whisper's timed segments."""
+        result = self.stt_service.transcribe(
+            audio_data,
+            condition_on_previous_text=False,
+            initial_prompt=prompt[-200:] or None,  # Keep wording consistent across windows
+        )
+        return result.get("segments", [])
+
+    def _transcribe_incrementally(self, recorder, updates, step_seconds, commit_seconds):
+        """
+        Transcribe overlapping windows while `recorder` is still capturing audio.
+
+        Every `step_seconds` of new audio the window starting at the last
+        committed sample is decoded again. Once the window is longer than
+        `commit_seconds`, all segments but the last are committed and the next
+        window starts at the last segment, so windows overlap and only the tail
+        is ever re-decoded. Partial transcripts are put on `updates`, followed
+        by the final transcript and None.
+        """
+        committed_text = ""
+        committed_samples = 0
+        decoded_samples = 0
+        step_samples = int(step_seconds * self.sample_rate)
+        commit_samples = int(commit_seconds * self.sample_rate)
+
+        def join(prefix, segments):
+            return " ".join(part for part in [prefix] + [seg["text"].strip() for seg in segments] if part)
+
+        try:
+            while True:
+                recording = recorder.is_alive()
+                available = self.audio_buffer.total_written
+                if recording and available - decoded_samples < step_samples:
+                    time.sleep(0.05)
+                    continue
+
+                window = self._buffered_audio(committed_samples)
+                decoded_samples = committed_samples + len(window)
+                segments = self._transcribe_segments(window, prompt=committed_text) if len(window) else []
+
+                if not recording:
+                    updates.put(join(committed_text, segments))
+                    return
+
+                if len(window) >= commit_samples and len(segments) > 1:
+                    committed_text = join(committed_text, segments[:-1])
+                    committed_samples += int(segments[-1]["start"] * self.sample_rate)
+                    segments = segments[-1:]
+                updates.put(join(committed_text, segments))
+        except Exception as e:
+            print(f"Error during incremental transcription: {e}")
+            updates.put(committed_text)
+        finally:
+            updates.put(None)
+
+    def listen_and_transcribe_stream(self, device_index=None, debug_audio_filename="debug_audio.wav",
+                                     step_seconds=1.0, commit_seconds=10.0):
+        """
+        Record audio and yield partial transcripts while the user is speaking.
+
+        Transcription runs on a background worker during recording, so the
+        last value yielded (the final transcript) is ready shortly after
+        silence is detected.
+        """
+        self.running = True  # Reset the running flag before starting
+        self.audio_buffer.clear()
+        updates = queue.Queue()
+
+        recorder = threading.Thread(
+            target=self.record_audio_with_silence_detection,
+            args=(device_index, debug_audio_filename),
+            daemon=True,
+        )
+        worker = threading.Thread(
+            target=self._transcribe_incrementally,
+            args=(recorder, updates, step_seconds, commit_seconds),
+            daemon=True,
+        )
+        recorder.start()
+        worker.start()
+
+        while True:
+            text = updates.get()
+            if text is None:
+                return
+            yield text
+
+    def listen_and_transcribe(self, device_index=None, debug_audio_filename="debug_audio.wav", on_partial=None):
+        """
+        Record and transcribe audio until silence is detected, saving debug audio.
+
+        If `on_partial` is given, audio is transcribed incrementally while
+        recording and `on_partial(text)` is called with each partial transcript.
+        """
+        if on_partial is not None:
+            transcription = ""
+            for transcription in self.listen_and_transcribe_stream(device_index, debug_audio_filename):
+                on_partial(transcription)
+            return transcription
+
         self.running = True  # Reset the running flag before starting
         audio_data = self.record_audio_with_silence_detection(device_index, debug_audio_filename)
         if len(audio_data) == 0:
@@ -0,0 +1,98 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+STT_BACKENDS = ("whisper", "whisper-int8")
+
+
+def _use_plain_linear(module):
+    """
+    Swap Whisper's `Linear` subclass for `torch.nn.Linear`, sharing the weights.
+
+    `quantize_dynamic` matches exact module types, so it skips subclasses.
+    Whisper's subclass only casts weights to the input dtype, which is a
+    no-op for fp32 CPU inference.
+    """
+    import torch
+
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+            plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+            plain.weight = child.weight
+            plain.bias = child.bias
+            setattr(module, name, plain)
+        else:
+            _use_plain_linear(child)
+
+
+def load_whisper_model(model_name="base", backend="whisper"):
+    """
+    Load a Whisper model for CPU inference.
+
+    "whisper" is the stock fp32 PyTorch model; "whisper-int8" applies dynamic
+    int8 quantization to its linear layers, which cuts memory and speeds up
+    CPU decoding.
+    """
+    import whisper
+
+    if backend not in STT_BACKENDS:
+        raise ValueError(f"Unknown STT backend '{backend}'. Choose one of: {', '.join(STT_BACKENDS)}")
+
+    model = whisper.load_model(model_name, device="cpu")
+    if backend == "whisper-int8":
+        import torch
+
+        _use_plain_linear(model)
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+class STTService:
+    """
+    Process-wide speech-to-text service.
+
+    Whisper is loaded once per replica and requests from all sessions go
+    through one bounded queue. Each replica is served by a single worker
+    thread, because Whisper's decoder keeps per-call state on the model, so
+    latency and memory depend on the number of replicas, not on the number
+    of users.
+    """
+
+    def __init__(self, model_name="base", backend=None, replicas=1, max_pending=32):
+        self.model_name = model_name
+        self.backend = backend or os.getenv("STT_BACKEND", "whisper")
+        self._requests = queue.Queue(maxsize=max_pending)
+        self._workers = []
+        for i in range(replicas):
+            model = load_whisper_model(model_name, self.backend)
+            worker = threading.Thread(target=self._serve, args=(model,), name=f"stt-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _serve(self, model):
+        while True:
+            audio_data, options, future = self._requests.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(model.transcribe(audio_data, fp16=False, **options))
+            except Exception as e:
+                future.set_exception(e)
+
+    def submit(self, audio_data, **options):
+        """Queue audio for transcription and return a Future of Whisper's result dict."""
+        future = Future()
+        self._requests.put((np.asarray(audio_data, dtype=np.float32), options, future))
+        return future
+
+    def transcribe(self, audio_data, **options):
+        """Transcribe audio, waiting for a free replica. Returns Whisper's result dict."""
+        return self.submit(audio_data, **options).result()
+
+    @property
+    def pending(self):
+        """Number of requests waiting for a replica."""
+        return self._requests.qsize()
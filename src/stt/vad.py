@@ -0,0 +1,64 @@
+import numpy as np
+
+try:
+    import webrtcvad
+except ImportError:  # Fall back to the energy detector alone
+    webrtcvad = None
+
+
+class VoiceActivityDetector:
+    """
+    Decide whether a block of audio contains speech.
+
+    An energy gate with an adaptive noise floor rejects quiet blocks cheaply;
+    louder blocks are confirmed by webrtcvad on 20 ms frames when it is
+    installed. The float-to-PCM conversion reuses scratch buffers between
+    calls; webrtcvad takes bytes, so each block is copied once for it.
+    """
+
+    def __init__(self, sample_rate=16000, aggressiveness=2, frame_ms=20, energy_margin_db=10.0, min_energy_db=-60.0):
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.energy_margin_db = energy_margin_db
+        self.min_energy_db = min_energy_db
+        self.noise_floor_db = min_energy_db
+        self._vad = webrtcvad.Vad(aggressiveness) if webrtcvad else None
+        self._scratch = np.empty(0, dtype=np.float32)
+        self._pcm = np.empty(0, dtype=np.int16)
+
+    def reset(self):
+        self.noise_floor_db = self.min_energy_db
+
+    def _energy_db(self, block):
+        energy = float(np.dot(block, block)) / max(len(block), 1)
+        return 10.0 * np.log10(energy + 1e-12)
+
+    def _webrtc_speech(self, block):
+        n = len(block)
+        if len(self._pcm) != n:
+            self._scratch = np.empty(n, dtype=np.float32)
+            self._pcm = np.empty(n, dtype=np.int16)
+        np.multiply(block, 32767.0, out=self._scratch)
+        np.clip(self._scratch, -32768.0, 32767.0, out=self._scratch)
+        self._pcm[:] = self._scratch
+
+        pcm_bytes = self._pcm.tobytes()
+        frame_bytes = self.frame_size * 2
+        frames = len(pcm_bytes) // frame_bytes
+        if not frames:
+            return True
+        voiced = sum(
+            self._vad.is_speech(pcm_bytes[i * frame_bytes:(i + 1) * frame_bytes], self.sample_rate)
+            for i in range(frames)
+        )
+        return voiced * 2 >= frames
+
+    def is_speech(self, block):
+        """Classify one mono float32 block as speech (True) or silence (False)."""
+        energy_db = self._energy_db(block)
+        loud = energy_db > max(self.noise_floor_db + self.energy_margin_db, self.min_energy_db)
+        speech = loud and (self._vad is None or self._webrtc_speech(block))
+        if not speech:
+            # Track background noise slowly so the gate adapts to the room
+            self.noise_floor_db = 0.95 * self.noise_floor_db + 0.05 * energy_db
+        return speech
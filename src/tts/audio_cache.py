@@ -0,0 +1,20 @@
+import hashlib
+
+from src.utils.disk_cache import DiskLRUCache
+
+
+class AudioCache(DiskLRUCache):
+    """
+    On-disk cache of synthesized audio, keyed by a hash of the backend,
+    voice and normalized text, with least-recently-used eviction once the
+    cache grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024):
+        super().__init__(cache_dir, max_bytes=max_bytes)
+
+    @staticmethod
+    def make_key(backend_name, voice, text, audio_format):
+        normalized = " ".join(text.split())
+        digest = hashlib.sha256(f"{backend_name}\0{voice}\0{normalized}".encode("utf-8")).hexdigest()
+        return f"{digest}.{audio_format}"
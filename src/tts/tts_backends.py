@@ -0,0 +1,67 @@
+import io
+import os
+import tempfile
+import threading
+
+
+class GTTSBackend:
+    """Google Text-to-Speech (needs network), returns MP3 bytes."""
+
+    name = "gtts"
+    audio_format = "mp3"
+
+    def __init__(self, lang="en"):
+        self.lang = lang
+        self.voice = lang
+
+    def synthesize(self, text):
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class Pyttsx3Backend:
+    """Offline system voices through pyttsx3, returns WAV bytes."""
+
+    name = "pyttsx3"
+    audio_format = "wav"
+
+    def __init__(self, rate=None, voice_id=None):
+        import pyttsx3
+
+        self._engine = pyttsx3.init()
+        self._lock = threading.Lock()  # The pyttsx3 engine is not thread-safe
+        if rate:
+            self._engine.setProperty("rate", rate)
+        if voice_id:
+            self._engine.setProperty("voice", voice_id)
+        self.voice = f"{self._engine.getProperty('voice')}@{self._engine.getProperty('rate')}"
+
+    def synthesize(self, text):
+        # pyttsx3 can only render to a file
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with self._lock:
+                self._engine.save_to_file(text, path)
+                self._engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.unlink(path)
+
+
+TTS_BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    Pyttsx3Backend.name: Pyttsx3Backend,
+}
+
+
+def create_tts_backend(name=None):
+    """Create the TTS backend selected by name or by the TTS_BACKEND environment variable."""
+    name = name or os.getenv("TTS_BACKEND", GTTSBackend.name)
+    if name not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{name}'. Choose one of: {', '.join(TTS_BACKENDS)}")
+    return TTS_BACKENDS[name]()
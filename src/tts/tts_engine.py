@@ -1,19 +1,95 @@
+import io
 import pygame
+import queue
 import tempfile
 import os
-from gtts import gTTS
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from src.tts.audio_cache import AudioCache
+from src.tts.tts_backends import create_tts_backend
+from src.utils.chunking import split_sentences
+
+
+def split_speech_segments(text, max_chars=200):
+    """
+    Split text into sentence-sized segments for synthesis.
+
+    The first sentence is always a segment of its own so playback starts as
+    early as possible. Each later sentence is appended to the previous
+    segment, unless that is the first one or the result would reach
+    `max_chars`, to avoid one synthesis request per fragment.
+    """
+    segments = []
+    for sentence in split_sentences(text):
+        # segments[0] is never extended; grouping starts at segments[1]
+        if len(segments) >= 2 and len(segments[-1]) + len(sentence) < max_chars:
+            segments[-1] = f"{segments[-1]} {sentence}"
+        else:
+            segments.append(sentence)
+    return segments
 
 
 class TTSEngine:
-    def __init__(self):
-        """Initialize the TTS Engine."""
+    def __init__(self, backend=None, synth_workers=3, cache_dir=None):
+        """
+        Initialize the TTS Engine.
+
+        `backend` is "gtts" (default) or "pyttsx3" for offline synthesis, and
+        can also be set with the TTS_BACKEND environment variable.
+        """
         pygame.mixer.init()  # Initialize the mixer module
+        self.backend = create_tts_backend(backend)
+        self.cache = AudioCache(
+            cache_dir or os.getenv("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "tts_cache")),
+            max_bytes=int(os.getenv("TTS_CACHE_MAX_MB", "256")) * 1024 * 1024,
+        )
         self.is_playing = False
         self.lock = threading.Lock()  # Lock for thread safety during playback
+        self._synth_pool = ThreadPoolExecutor(max_workers=synth_workers, thread_name_prefix="tts-synth")
+        self._generation = 0  # Bumped on every stop to cancel queued and playing audio
+        self._playlist = queue.Queue()  # (generation, Future of audio) in playback order
+        self._channel = None  # Mixer channel used for PCM playback
+
+        # Single long-lived playback worker
+        threading.Thread(target=self._playback_loop, name="tts-player", daemon=True).start()
+
+    def synthesize(self, text):
+        """Return synthesized audio bytes for `text`, using the audio cache."""
+        key = AudioCache.make_key(self.backend.name, self.backend.voice, text, self.backend.audio_format)
+        audio = self.cache.get(key)
+        if audio is None:
+            audio = self.backend.synthesize(text)
+            self.cache.put(key, audio)
+        return audio
+
+    def enqueue(self, text):
+        """
+        Queue text to be spoken after anything already queued, without interrupting.
+
+        Sentences are synthesized ahead of playback on a worker pool.
+        """
+        text = str(text)
+        with self.lock:
+            generation = self._generation
+            for segment in split_speech_segments(text):
+                self._playlist.put((generation, self._synth_pool.submit(self.synthesize, segment)))
+
+    def enqueue_audio(self, audio):
+        """
+        Queue ready audio for playback: encoded bytes (mp3/wav) or an int16
+        PCM NumPy array matching the mixer format.
+        """
+        future = Future()
+        future.set_result(audio)
+        with self.lock:
+            self._playlist.put((self._generation, future))
 
     def speak(self, text):
-        """Speak the given text using gTTS and pygame."""
+        """
+        Speak the given text sentence by sentence, interrupting current playback.
+
+        Playback starts as soon as the first sentence is synthesized.
+        """
         if not isinstance(text, str):
           try:
               text = str(text)
@@ -26,38 +102,66 @@ class TTSEngine:
 
         # Stop any ongoing playback
         self.stop()
+        self.enqueue(text)
 
-        # Create a temporary file for the audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio:
-            tts = gTTS(text=text, lang="en")
-            tts.save(temp_audio.name)
-            temp_audio_path = temp_audio.name
+    def _start_playback(self, audio):
+        """Start playing in-memory audio and return a callable telling if it is still busy."""
+        if isinstance(audio, (bytes, bytearray)):
+            pygame.mixer.music.load(io.BytesIO(audio), self.backend.audio_format)
+            pygame.mixer.music.play()
+            return pygame.mixer.music.get_busy
+        sound = pygame.sndarray.make_sound(audio)
+        if self._channel is None:
+            self._channel = pygame.mixer.Channel(0)
+        self._channel.play(sound)
+        return self._channel.get_busy
 
-        def play_audio():
-            """Internal function to play the audio file."""
+    def _playback_loop(self):
+        """Play queued audio in order until the process exits."""
+        clock = pygame.time.Clock()
+        while True:
+            generation, future = self._playlist.get()
+            if generation != self._generation:
+                future.cancel()
+                continue
             try:
-                with self.lock:  # Ensure thread safety
-                    self.is_playing = True
-                    pygame.mixer.music.load(temp_audio_path)
-                    pygame.mixer.music.play()
-
-                # Wait for the playback to complete
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)  # Avoid blocking the main thread
-            finally:
-                with self.lock:
-                    self.is_playing = False
-                if os.path.exists(temp_audio_path):
-                    os.unlink(temp_audio_path)  # Clean up the temporary file
+                audio = future.result()
+            except Exception as e:
+                print(f"Error synthesizing speech: {e}")
+                continue
+
+            with self.lock:  # Ensure thread safety
+                if generation != self._generation:
+                    continue
+                try:
+                    is_busy = self._start_playback(audio)
+                except Exception as e:
+                    print(f"Error playing audio: {e}")
+                    continue
+                self.is_playing = True
 
-        # Run the playback in a separate thread
-        threading.Thread(target=play_audio, daemon=True).start()
+            # Wait for the playback to complete or be cancelled
+            while generation == self._generation and is_busy():
+                clock.tick(20)
+
+            with self.lock:
+                if generation == self._generation:
+                    self.is_playing = False
 
     def stop(self):
-        """Stop the current audio playback."""
+        """Stop the current audio playback and drop everything queued."""
         with self.lock:
+            self._generation += 1
+            while True:
+                try:
+                    _, future = self._playlist.get_nowait()
+                except queue.Empty:
+                    break
+                future.cancel()
             if self.is_playing:
                 pygame.mixer.music.stop()  # Stop playback immediately
+                if self._channel is not None:
+                    self._channel.stop()
                 self.is_playing = False
 
 
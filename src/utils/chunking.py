@@ -0,0 +1,184 @@
+import re
+
+# all-MiniLM-L6-v2 truncates input after 256 wordpieces; the target leaves a
+# margin for the estimate in `count_tokens` undercounting unusual text
+DEFAULT_TARGET_TOKENS = 200
+DEFAULT_OVERLAP_TOKENS = 32
+DEFAULT_MIN_TOKENS = 40
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+# Characters per estimated subword token in long words
+_CHARS_PER_TOKEN = 6
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def count_tokens(text):
+    """
+    Estimate the number of model tokens in `text` without a tokenizer.
+
+    Punctuation marks count as one token each and words as one token per
+    started `_CHARS_PER_TOKEN` characters, so long or unusual words that
+    WordPiece/BPE split into several pieces are not undercounted.
+    """
+    return sum(-(-len(token) // _CHARS_PER_TOKEN) for token in _TOKEN_RE.findall(text))
+
+
+def split_sentences(text):
+    """
+    Split text into sentences, treating blank lines as hard boundaries.
+
+    Args:
+        text (str): Raw text.
+
+    Returns:
+        list[str]: Non-empty sentences with whitespace collapsed.
+    """
+    sentences = []
+    for paragraph in _PARAGRAPH_RE.split(text or ""):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        sentences.extend(s for s in _SENTENCE_RE.split(paragraph) if s)
+    return sentences
+
+
+def _split_long_word(word, target_tokens):
+    """
+    Break a single whitespace-free run longer than the target (URLs, hashes,
+    runs like "a-a-a-...") at token boundaries, and overlong tokens by characters.
+    """
+    max_chars = target_tokens * _CHARS_PER_TOKEN
+    parts = []
+    for match in re.finditer(r"\w+|[^\w\s]", word):
+        token = match.group()
+        parts.extend(token[i:i + max_chars] for i in range(0, len(token), max_chars))
+
+    pieces = []
+    current = ""
+    tokens = 0
+    for part in parts:
+        part_tokens = count_tokens(part)
+        if current and tokens + part_tokens > target_tokens:
+            pieces.append(current)
+            current, tokens = "", 0
+        current += part
+        tokens += part_tokens
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split_long_sentence(sentence, target_tokens):
+    """Break a sentence longer than the target into windows of at most `target_tokens`."""
+    pieces = []
+    words = []
+    tokens = 0
+    for long_word in sentence.split():
+        for word in (_split_long_word(long_word, target_tokens) if count_tokens(long_word) > target_tokens else [long_word]):
+            word_tokens = count_tokens(word)
+            if words and tokens + word_tokens > target_tokens:
+                pieces.append((" ".join(words), tokens))
+                words, tokens = [], 0
+            words.append(word)
+            tokens += word_tokens
+    if words:
+        pieces.append((" ".join(words), tokens))
+    return pieces
+
+
+def chunk_text(
+    text,
+    target_tokens=DEFAULT_TARGET_TOKENS,
+    overlap_tokens=DEFAULT_OVERLAP_TOKENS,
+    min_tokens=DEFAULT_MIN_TOKENS,
+):
+    """
+    Split text into sliding-window chunks of roughly `target_tokens` tokens.
+
+    Chunks end on sentence boundaries where possible and repeat up to
+    `overlap_tokens` tokens of trailing sentences from the previous chunk.
+    A trailing fragment smaller than `min_tokens` is merged into the chunk
+    before it instead of being emitted on its own, as long as that keeps the
+    chunk within `target_tokens`, which is never exceeded.
+
+    Args:
+        text (str): Raw text to chunk.
+        target_tokens (int): Maximum tokens per chunk.
+        overlap_tokens (int): Tokens carried over between consecutive chunks.
+        min_tokens (int): Minimum size of a standalone chunk.
+
+    Returns:
+        list[str]: Chunk texts, in document order.
+    """
+    pieces = []
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if tokens > target_tokens:
+            pieces.extend(_split_long_sentence(sentence, target_tokens))
+        elif tokens:
+            pieces.append((sentence, tokens))
+
+    chunks = []  # (text, tokens) pairs
+    window = []
+    window_tokens = 0
+    carried = 0  # Number of leading sentences in the window carried over as overlap
+    new_tokens = 0  # Tokens in the window that are not overlap
+
+    for sentence, tokens in pieces:
+        if new_tokens and window_tokens + tokens > target_tokens:
+            chunks.append((" ".join(s for s, _ in window), window_tokens))
+
+            # Carry trailing sentences over as overlap
+            overlap = []
+            overlap_size = 0
+            for prev_sentence, prev_tokens in reversed(window):
+                if overlap_size + prev_tokens > overlap_tokens or overlap_size + prev_tokens + tokens > target_tokens:
+                    break
+                overlap.insert(0, (prev_sentence, prev_tokens))
+                overlap_size += prev_tokens
+            window, window_tokens, carried, new_tokens = overlap, overlap_size, len(overlap), 0
+
+        window.append((sentence, tokens))
+        window_tokens += tokens
+        new_tokens += tokens
+
+    if new_tokens:
+        if chunks and new_tokens < min_tokens and chunks[-1][1] + new_tokens <= target_tokens:
+            # Merge a small trailing fragment into the previous chunk
+            prev_text, prev_tokens = chunks.pop()
+            tail = [s for s, _ in window[carried:]]
+            chunks.append((" ".join([prev_text] + tail), prev_tokens + new_tokens))
+        else:
+            chunks.append((" ".join(s for s, _ in window), window_tokens))
+
+    return [chunk for chunk, _ in chunks]
+
+
+
+_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+class SentenceBuffer:
+    """
+    Accumulate streamed text and release it one complete sentence at a time.
+    """
+
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, text):
+        """Add a piece of streamed text and return the sentences it completed."""
+        self._pending += text
+        last_boundary = None
+        for last_boundary in _BOUNDARY_RE.finditer(self._pending):
+            pass
+        if last_boundary is None:
+            return []
+        complete, self._pending = self._pending[:last_boundary.start()], self._pending[last_boundary.end():]
+        return split_sentences(complete)
+
+    def flush(self):
+        """Return whatever is left as final sentences and reset the buffer."""
+        remainder, self._pending = self._pending, ""
+        return split_sentences(remainder)
@@ -0,0 +1,64 @@
+import queue
+import threading
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, error):
+        self.error = error
+
+
+def run_stage(iterable, maxsize=8, name="pipeline-stage"):
+    """
+    Consume `iterable` on a background thread and yield its items through a
+    bounded queue.
+
+    Chaining several stages lets extraction, chunking and embedding overlap,
+    while the bounded queue keeps at most `maxsize` items buffered between
+    two stages. Exceptions raised by the producer are re-raised in the
+    consumer, and the producer stops once the consumer goes away.
+
+    Args:
+        iterable (Iterable): Source of items, typically a generator.
+        maxsize (int): Maximum number of buffered items.
+        name (str): Name of the producer thread, for debugging.
+
+    Yields:
+        Items from `iterable`, in order.
+    """
+    buffer = queue.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(item):
+        # Block while the queue is full, but give up once the consumer stops
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as e:
+            put(_StageError(e))
+            return
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
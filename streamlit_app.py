@@ -2,14 +2,19 @@ import base64
 from src.agents.web_search_agent import  create_web_search_task, initiate_web_agent
 from src.api.models import initialize_groq_llm, initialize_openai_llm
 import streamlit as st
-from src.api.chromadb_api import get_uploaded_documents, remove_document_from_chromadb, retrieve_relevant_docs_from_chromadb
+from src.api.chromadb_api import embed_query, get_embedding_cache_stats, get_uploaded_documents, remove_document_from_chromadb, retrieve_context
 from src.agents.crew_agent import  create_pdf_summary_task, create_qa_task, create_quiz_task, initialize_pdf_summary_agent, initialize_question_answering_agent, initialize_quiz_agent
 from src.agents.content_agent import ContentIngestionAgent
+from src.agents.ingestion_jobs import ACTIVE_STATUSES, IngestionScheduler
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 from crewai import Crew,Process
-from src.stt.real_time_stt import RealTimeSTT
-from src.tts.tts_engine import TTSEngine
+from src.agents.fast_path import needs_summary, stream_fast_answer
+from src.agents.hybrid_search import retrieve_hybrid_context
+from src.agents.response_cache import SemanticResponseCache, context_fingerprint
+from src.agents.streaming import stream_crew
+from src.utils.chunking import SentenceBuffer
 
 load_dotenv()
 
@@ -17,9 +22,6 @@ groq_api_key = os.getenv("GROQ_API_KEY")
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
 
-# Initialize content ingestion agent
-content_agent = ContentIngestionAgent()
-
 # Streamlit setup
 st.set_page_config(
     page_title="Personalized Learning Assistant",
@@ -32,23 +34,86 @@ llm_options = {"Groq API": initialize_groq_llm, "OpenAI": initialize_openai_llm}
 selected_llm_name = st.sidebar.selectbox("Choose LLM", list(llm_options.keys()), key="llm_choice")
 st.sidebar.write("Selected LLM:", selected_llm_name)
 
-llm_initializer = llm_options[selected_llm_name]
-llm = llm_initializer()
 
-# Initialize agents
-pdf_summary_agent = initialize_pdf_summary_agent(llm)
-qa_agent = initialize_question_answering_agent(llm)
-quiz_agent = initialize_quiz_agent(llm)
+# LLM clients are thread-safe and keep their HTTP connection pools, so one
+# per configuration is shared by all sessions and reruns
+@st.cache_resource
+def get_llm(llm_name):
+    return llm_options[llm_name]()
+
+
+def get_agents(llm_name):
+    # Agents hold per-run crew state, so each session keeps its own set and
+    # rebuilds it only when the selected LLM changes
+    cached = st.session_state.get("agents")
+    if cached is None or cached["llm_name"] != llm_name:
+        agent_llm = get_llm(llm_name)
+        cached = {
+            "llm_name": llm_name,
+            "pdf_summary": initialize_pdf_summary_agent(agent_llm),
+            "qa": initialize_question_answering_agent(agent_llm),
+            "quiz": initialize_quiz_agent(agent_llm),
+            "web_search": initiate_web_agent(agent_llm),
+        }
+        st.session_state.agents = cached
+    return cached
+
+
+llm = get_llm(selected_llm_name)
+
+agents_by_role = get_agents(selected_llm_name)
+pdf_summary_agent = agents_by_role["pdf_summary"]
+qa_agent = agents_by_role["qa"]
+quiz_agent = agents_by_role["quiz"]
+
+web_search_agent = agents_by_role["web_search"]
+
+
+# Heavy resources are created on first use and shared across reruns and sessions
+@st.cache_resource
+def get_content_agent():
+    return ContentIngestionAgent()
+
+
+@st.cache_resource
+def get_response_cache():
+    return SemanticResponseCache(
+        similarity_threshold=float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.95")),
+        ttl_seconds=int(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+    )
+
+
+@st.cache_resource
+def get_ingestion_scheduler():
+    return IngestionScheduler(get_content_agent())
+
+
+@st.cache_resource
+def get_stt_service():
+    # Imported here so Whisper/torch only load when voice input is used
+    from src.stt.stt_service import STTService
+    return STTService(model_name="base")
+
+
+def get_real_time_stt():
+    # Recording state is per session; the Whisper model is shared
+    if "real_time_stt" not in st.session_state:
+        from src.stt.real_time_stt import RealTimeSTT
+        st.session_state.real_time_stt = RealTimeSTT(stt_service=get_stt_service())
+    return st.session_state.real_time_stt
+
+
+@st.cache_resource
+def get_tts_engine():
+    # Imported here so pygame only loads when voice output is used
+    from src.tts.tts_engine import TTSEngine
+    return TTSEngine()
 
-web_search_agent = initiate_web_agent(llm)
 
-# Initialize Whisper-based STT and TTS
 tts_response = ''
-real_time_stt = RealTimeSTT(model_name="base")
-tts_engine = TTSEngine()
 
 
-content_type = st.sidebar.selectbox("Choose Content Type to Upload", ["PDF", "YouTube Video", "PowerPoint"])
+content_type = st.sidebar.selectbox("Choose Content Type to Upload", ["PDF", "YouTube Video", "PowerPoint", "Image"])
 
 # Agent selection
 selected_agent = st.sidebar.selectbox("Choose Agent", ["Personalized Learning Assistant", "Quiz Creator"])
@@ -56,14 +121,84 @@ st.sidebar.write("Selected Agent:", selected_agent)
 
 
 # Search mode toggle
-search_mode = st.sidebar.radio("Search Mode", ["Local", "Online"])
+search_mode = st.sidebar.radio("Search Mode", ["Local", "Online", "Hybrid"])
+
+# Scope local retrieval to selected documents, content types, pages and ingest dates
+retrieval_filters = {}
+if search_mode in ("Local", "Hybrid"):
+    with st.sidebar.expander("Search Scope"):
+        retrieval_filters["file_names"] = st.multiselect(
+            "Documents", [document["name"] for document in get_uploaded_documents()], key="scope_files"
+        )
+        retrieval_filters["types"] = st.multiselect("Content types", ["pdf", "pptx", "youtube", "image"], key="scope_types")
+        if st.checkbox("Limit pages / slides", key="scope_limit_pages"):
+            first_page = st.number_input("From page / slide", min_value=1, value=1, key="scope_first_page")
+            last_page = st.number_input("To page / slide", min_value=first_page, value=first_page, key="scope_last_page")
+            retrieval_filters["position_range"] = (first_page, last_page)
+        ingested_since = st.date_input("Ingested since", value=None, key="scope_ingested_since")
+        if ingested_since:
+            retrieval_filters["ingested_after"] = datetime.combine(ingested_since, datetime.min.time()).timestamp()
 
 response_mode = st.sidebar.radio("Response Mode", ["Text", "Voice"], index=0)
 
+cache_stats = get_embedding_cache_stats()
+st.sidebar.caption(
+    f"Embedding cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} vectors"
+)
+
 
 # Main Layout
 col_chat, col_files = st.columns([3, 1])
 
+def render_answer_stream(events, n_tasks, references):
+    """
+    Render streamed answer events in an assistant chat message and return the final answer.
+
+    `events` yields ("token", str), ("task", TaskOutput) and ("result", ...)
+    tuples, as produced by `stream_crew` or `stream_fast_answer`.
+    """
+    with messages_container:
+        with st.chat_message("assistant"):
+            # Stream tokens and finished intermediate tasks as they are produced
+            steps_container = st.container()
+            answer_placeholder = st.empty()
+            speak_live = response_mode == "Voice"
+            if speak_live:
+                get_tts_engine().stop()
+            sentences = SentenceBuffer()
+            streamed = ""
+            finished_tasks = 0
+            result = ""
+
+            for kind, payload in events:
+                if kind == "token":
+                    streamed += payload
+                    answer_placeholder.markdown(streamed + "▌")
+                    # Only the last task produces the answer that is spoken
+                    if speak_live and finished_tasks == n_tasks - 1:
+                        for sentence in sentences.feed(payload):
+                            get_tts_engine().enqueue(sentence)
+                elif kind == "task":
+                    finished_tasks += 1
+                    if finished_tasks < n_tasks:
+                        with steps_container.expander(f"Step {finished_tasks}: {payload.agent}"):
+                            st.markdown(payload.raw)
+                    streamed = ""
+                    answer_placeholder.empty()
+                elif kind == "result":
+                    result = str(payload)
+
+            answer_placeholder.markdown(result)
+            if speak_live:
+                for sentence in sentences.flush():
+                    get_tts_engine().enqueue(sentence)
+                st.session_state.tts_used = True
+            if references:
+                st.caption("Sources: " + "; ".join(f"{ref['file_name']} ({ref['location']})" for ref in references))
+    return result
+
+
 def process_input(user_input, agent_type):
     st.session_state.messages.append({"role": "user", "content": user_input})
     with messages_container:
@@ -72,11 +207,52 @@ def process_input(user_input, agent_type):
 
     tasks = []
     agents = []
+    references = []
 
+    chunk_ids = []
     if search_mode == "Local":
-        context = retrieve_relevant_docs_from_chromadb(user_input)
-        if context:
-            tasks.append(create_pdf_summary_task(context=context, prompt=prompt, agent=pdf_summary_agent))
+        context = retrieve_context(user_input, filters=retrieval_filters)
+        references = context["references"]
+        chunk_ids = [chunk_id for ref in references for chunk_id in ref["chunk_ids"]]
+    elif search_mode == "Hybrid":
+        # Local and web sources are searched concurrently, each with its own timeout
+        context = retrieve_hybrid_context(user_input, filters=retrieval_filters)
+        references = context["references"]
+        chunk_ids = [chunk_id for ref in references for chunk_id in ref["chunk_ids"] or [ref["location"]]]
+
+    # Serve near-identical questions over the same context from the response
+    # cache. Online answers depend on live search results the app never sees
+    # before the crew runs, so they are not cached.
+    use_cache = search_mode != "Online"
+    if use_cache:
+        query_embedding = embed_query(user_input)
+        fingerprint = context_fingerprint(f"{search_mode}:{selected_llm_name}", chunk_ids)
+        cached = get_response_cache().lookup(query_embedding, fingerprint, agent_type)
+    else:
+        cached = None
+    if cached:
+        result = render_answer_stream(
+            [("token", cached["answer"]), ("result", cached["answer"])], 1, cached["references"]
+        )
+        st.session_state.messages.append({"role": "assistant", "content": result})
+        return result
+
+    def finish(result):
+        if use_cache and result.strip():
+            get_response_cache().store(query_embedding, fingerprint, agent_type, result, references)
+        st.session_state.messages.append({"role": "assistant", "content": result})
+        return result
+
+    if search_mode in ("Local", "Hybrid"):
+        # In Hybrid mode the context merges local chunks and web results
+        if not needs_summary(user_input):
+            # Fast path: answer from the packed context in a single LLM call
+            return finish(render_answer_stream(
+                stream_fast_answer(llm, user_input, context["text"], agent_type), 1, references
+            ))
+
+        if context["text"]:
+            tasks.append(create_pdf_summary_task(context=context["text"], prompt=user_input, agent=pdf_summary_agent))
             agents.append(pdf_summary_agent)
 
         if agent_type == "Personalized Learning Assistant":
@@ -98,12 +274,7 @@ def process_input(user_input, agent_type):
         process=Process.sequential,
         verbose=True,
     )
-    result = crew.kickoff()
-    st.session_state.messages.append({"role": "assistant", "content": result})
-    with messages_container:
-        with st.chat_message("assistant"):
-            st.markdown(result)
-            return result
+    return finish(render_answer_stream(stream_crew(crew), len(tasks), references))
 
 with col_chat:
     if selected_agent == "Personalized Learning Assistant":
@@ -140,15 +311,23 @@ with col_chat:
 
         # Start Listening button
         if st.button("Start Listening", key="start_listening_button"):
+            # Barge-in: stop any spoken answer before recording
+            if st.session_state.get("tts_used"):
+                get_tts_engine().stop()
             with st.spinner("Listening..."):
-                transcription = real_time_stt.listen_and_transcribe()
+                partial_placeholder = st.empty()
+                transcription = get_real_time_stt().listen_and_transcribe(
+                    on_partial=lambda text: partial_placeholder.markdown(f"🎙️ {text}")
+                )
+                partial_placeholder.empty()
                 if transcription:
                     tts_response = str(process_input(transcription, selected_agent))
 
         button_text = "Speak Response"            
         # TTS Response
         if st.checkbox("Speak Response", key="speak_response_checkbox"):
-            tts_engine.speak(tts_response)
+            get_tts_engine().speak(tts_response)
+            st.session_state.tts_used = True
             button_text = 'Stop Playback'
 
 
@@ -175,19 +354,17 @@ with col_files:
             if uploaded_pdfs:
                 for file in uploaded_pdfs:
                     if file.name not in [f["name"] for f in st.session_state.uploaded_files]:
-                        # Process PDF
-
-                        processing_message = content_agent.process_pdf(file)
-                        st.write(processing_message)
+                        # Parse and embed the PDF in the background
+                        get_ingestion_scheduler().submit(file.name, file.getvalue(), "pdf")
 
                         # Add to uploaded files
-                        add_to_uploaded_files(file.name)
+                        add_to_uploaded_files(file.name, status="Queued")
 
         elif content_type == "YouTube Video":
             video_url = st.text_input("Enter YouTube Video URL")
             if st.button("Process Video"):
                 # Process YouTube Video
-                processing_message = content_agent.process_youtube_video(video_url)
+                processing_message = get_content_agent().process_youtube_video(video_url)
                 st.write(processing_message)
 
                 # Add to uploaded files
@@ -198,38 +375,69 @@ with col_files:
         elif content_type == "PowerPoint":
             uploaded_pptx = st.file_uploader("Upload PowerPoint File", type="pptx")
             if uploaded_pptx and st.button("Process PowerPoint"):
-                # Process PowerPoint
-                processing_message = content_agent.process_pptx(uploaded_pptx)
-                st.write(processing_message)
+                # Parse and embed the PowerPoint in the background
+                get_ingestion_scheduler().submit(uploaded_pptx.name, uploaded_pptx.getvalue(), "pptx")
 
                 # Add to uploaded files
                 if uploaded_pptx.name not in [f["name"] for f in st.session_state.uploaded_files]:
-                    add_to_uploaded_files(uploaded_pptx.name)
+                    add_to_uploaded_files(uploaded_pptx.name, status="Queued")
+
+        elif content_type == "Image":
+            uploaded_images = st.file_uploader(
+                "Upload scanned pages or images", type=["png", "jpg", "jpeg", "tif", "tiff", "bmp"],
+                accept_multiple_files=True,
+            )
+            if uploaded_images and st.button("Process Images"):
+                for file in uploaded_images:
+                    # OCR and embed the image in the background
+                    get_ingestion_scheduler().submit(file.name, file.getvalue(), "image")
+
+                    # Add to uploaded files
+                    if file.name not in [f["name"] for f in st.session_state.uploaded_files]:
+                        add_to_uploaded_files(file.name, status="Queued")
+
+        # Ingestion jobs are polled in a fragment so only this panel reruns
+        @st.fragment(run_every=2)
+        def show_ingestion_jobs():
+            scheduler = get_ingestion_scheduler()
+            jobs = scheduler.jobs()
+            active_ids = {job["id"] for job in jobs if job["status"] in ACTIVE_STATUSES}
+            finished_ids = st.session_state.get("active_ingestion_jobs", set()) - active_ids
+            st.session_state.active_ingestion_jobs = active_ids
+            if finished_ids:
+                # A job finished: rerun the whole app so the file list picks it up
+                st.rerun(scope="app")
+            if not jobs:
+                return
+            st.subheader("Ingestion Jobs")
+            for job in jobs:
+                if job["status"] in ACTIVE_STATUSES:
+                    st.progress(job["progress"], text=f"{job['name']} - {job['status']}")
+                elif job["status"] == "Failed":
+                    st.error(job["message"])
+                else:
+                    st.write(f"✅ {job['message']}")
+            if not scheduler.has_active_jobs() and st.button("Clear finished jobs", key="clear_ingestion_jobs"):
+                scheduler.clear_finished()
+                st.rerun()
+
+        show_ingestion_jobs()
 
         # Display Uploaded Files
         st.subheader("Uploaded Files")
-        uploaded_documents = get_uploaded_documents()
-        print(uploaded_documents)
-
-        filter_query = st.text_input("Search files by name:", key="file_filter_query").strip().lower()
-        filtered_files = [
-            file for file in uploaded_documents
-            if filter_query in file["name"].lower()
-        ] if filter_query else uploaded_documents
+        filter_query = st.text_input("Search files by name:", key="file_filter_query").strip()
+        filtered_files = get_uploaded_documents(name_filter=filter_query)
 
         # Display files in a structured format
         for file in filtered_files:
             col1, col2 = st.columns([3, 1])
-            col1.write(f"📄 {file['name']} - {file['status']}")
+            col1.write(f"📄 {file['name']} - {file['status']} ({file['chunk_count']} chunks)")
 
             # Add a delete button
             if col2.button("Remove", key=f"remove_{file['name']}"):
                 # Remove all chunks of the file from ChromaDB
                 try:
-                    remove_message = remove_document_from_chromadb(file["name"], file["ids"])
+                    remove_message = remove_document_from_chromadb(file["name"])
                     st.success(remove_message)
                 except Exception as e:
-                    st.error(f"Error removing {file['name']}: {str(e)}")
-
-                # Refresh the displayed documents
-                uploaded_documents = get_uploaded_documents()
\ No newline at end of file
+                    st.error(f"Error removing {file['name']}: {str(e)}")
\ No newline at end of file